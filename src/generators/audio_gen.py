@@ -137,17 +137,14 @@ import os
 import random
 import re
 from datetime import datetime
+from src.generators import voice_catalog
 
 logger = logging.getLogger(__name__)
 
-# Mature, raconteur/anecdotist voices
-NATURAL_VOICES = [
-    "en-US-GuyNeural",         # Deep, mature male
-    "en-GB-RyanNeural",        # British male, authoritative
-    "en-US-ChristopherNeural", # Warm, calm male
-    "en-GB-LibbyNeural",       # British female, elegant
-    "en-US-AriaNeural",        # Warm female narrator
-]
+DEFAULT_LOCALE = "en-US"
+
+# Mature, raconteur/anecdotist voices are the "News, Novel" narrators in voices.txt
+NARRATOR_CATEGORY = "novel"
 
 # Specifically for "Spuds"-like elderly/calm style (Grandpa Spuds Oxley charm)
 ELDERLY_VOICES = [
@@ -256,17 +253,57 @@ async def _generate_voiceover_async(text: str, output_file: str, voice: str, rat
     # Filter out sentence markers if we have real words
     return real_words
 
+# ---------------- VOICE SELECTION ---------------- #
+def select_voice_pool(locale=DEFAULT_LOCALE, specific_gender=None, style=None, config=None):
+    """
+    Picks candidate voices through the indexed voice catalog.
+    Voices listed in settings.yaml (audio.voices_male / voices_female / voices_elderly)
+    are preferred when they exist for the locale; otherwise the catalog's narrator
+    voices for the locale/gender are used, widening the filter if nothing matches.
+    """
+    catalog = voice_catalog.get_catalog()
+    audio_config = (config or {}).get('audio', {})
+
+    if style == "elderly":
+        preferred = audio_config.get('voices_elderly') or ELDERLY_VOICES
+        gender = specific_gender or "male"
+    elif specific_gender in ("male", "female"):
+        preferred = audio_config.get(f'voices_{specific_gender}', [])
+        gender = specific_gender
+    else:
+        preferred = audio_config.get('voices_male', []) + audio_config.get('voices_female', [])
+        gender = None
+
+    pool = [v for v in preferred if v in catalog and catalog.get(v)["locale"] == locale]
+    if pool:
+        return pool
+
+    for filters in (
+        {"gender": gender, "category": NARRATOR_CATEGORY},
+        {"gender": gender},
+        {},
+    ):
+        pool = catalog.find(locale=locale, **filters)
+        if pool:
+            return pool
+
+    logger.warning(f"No voices found for locale {locale}. Falling back to {ELDERLY_VOICES[0]}.")
+    return ELDERLY_VOICES
+
 # ---------------- PUBLIC API ---------------- #
 def generate_voiceover(
     text: str,
     output_dir="assets/temp",
     specific_gender=None,
     style=None,
-    long_form=False
+    long_form=False,
+    locale=DEFAULT_LOCALE,
+    config=None
 ):
     """
     Generates natural, mature/anecdotist-style voiceover using Edge TTS.
     Styles: 'elderly' (Spuds-like), 'natural' (default)
+    locale selects voices from the voice catalog (e.g. 'en-GB', 'es-ES').
     Returns: (audio_filepath, word_boundaries, sanitized_text)
     """
     try:
@@ -280,20 +317,10 @@ def generate_voiceover(
     pitch = "-2Hz"
 
     if style == "elderly":
-        pool = ELDERLY_VOICES
         rate = "-25%"  # Winning "WarmGrandpa" rate
         pitch = "-12Hz" # Winning "WarmGrandpa" pitch
-    elif specific_gender == "male":
-        # Christopher and Guy are best for "Deep/Mature"
-        pool = [v for v in NATURAL_VOICES if "Christopher" in v or "Guy" in v]
-    elif specific_gender == "female":
-        pool = [v for v in NATURAL_VOICES if "Libby" in v or "Aria" in v]
-    else:
-        pool = NATURAL_VOICES
 
-    if not pool:
-        pool = NATURAL_VOICES
-        
+    pool = select_voice_pool(locale, specific_gender=specific_gender, style=style, config=config)
     voice = random.choice(pool)
     logger.info(f"Selected voice: {voice} (style: {style})")
 
@@ -0,0 +1,151 @@
+import os
+import random
+import shutil
+import logging
+import threading
+from src.generators import image_gen
+
+logger = logging.getLogger(__name__)
+
+# Overridden from image_generation.prefetch_pool in settings.yaml via configure()
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "dir": "assets/cache/background_pool",
+    "size": 3,  # images kept ready per (orientation, prompt family)
+    "join_seconds": 120,  # how long a finished run waits for a running refill before exiting
+}
+
+# What each pipeline pops
+SHORTS_KEY = ("portrait", "abstract")
+LONG_FORM_KEY = ("landscape", "cinematic")
+
+_settings = dict(DEFAULT_SETTINGS)
+_config = None
+_lock = threading.Lock()
+_worker = None
+
+def configure(config=None):
+    """
+    Applies image_generation.prefetch_pool and keeps the config for the provider cascade.
+    The pool is disabled on GitHub Actions: the runner's pool dir doesn't persist, so it
+    would always start empty and refills would only compete with the live fallback.
+    """
+    global _settings, _config
+    _config = config or {}
+    _settings = dict(DEFAULT_SETTINGS)
+    pool_settings = _config.get('image_generation', {}).get('prefetch_pool') or {}
+    _settings.update({k: v for k, v in pool_settings.items() if v is not None})
+    if _settings['enabled'] and os.environ.get("GITHUB_ACTIONS"):
+        logger.info("Background pool disabled in CI (pool dir is not persisted between runs).")
+        _settings['enabled'] = False
+    return _settings
+
+def _pool_dir(orientation, family):
+    return os.path.join(_settings['dir'], f"{orientation}_{family}")
+
+def _pooled_images(orientation, family):
+    pool_dir = _pool_dir(orientation, family)
+    if not os.path.isdir(pool_dir):
+        return []
+    images = [os.path.join(pool_dir, f) for f in os.listdir(pool_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    images.sort(key=os.path.getmtime)
+    return images
+
+def pop(orientation, family, output_dir="assets/temp"):
+    """
+    Takes the oldest ready image out of the pool into output_dir (it is then the
+    caller's temp file) and wakes the worker to replace it. An empty pool doesn't
+    start a refill here: the caller's live generation would be competing with it.
+    Returns the path, or None if the pool is empty or disabled.
+    """
+    if not _settings['enabled']:
+        return None
+    path = None
+    with _lock:
+        images = _pooled_images(orientation, family)
+        if images:
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, os.path.basename(images[0]))
+            shutil.move(images[0], path)
+    if path:
+        logger.info(f"Using prefetched {orientation}/{family} background: {path}")
+        start_worker([(orientation, family)])
+    return path
+
+def fill(orientation, family, size=None):
+    """
+    Generates images until the pool for (orientation, family) holds `size` of them.
+    Only real provider images are pooled, never the gradient placeholder.
+    Returns the number of images added.
+    """
+    size = _settings['size'] if size is None else size
+    pool_dir = _pool_dir(orientation, family)
+    incoming_dir = os.path.join(pool_dir, ".incoming")
+    # Partial files from a worker killed at process exit (still running when wait() timed out)
+    shutil.rmtree(incoming_dir, ignore_errors=True)
+    added = 0
+    while len(_pooled_images(orientation, family)) < size:
+        prompt = random.choice(image_gen.PROMPT_FAMILIES[family])
+        # Generated outside the pool, then moved in, so pop() never sees a partial file
+        path = image_gen.generate_background(
+            prompt, output_dir=incoming_dir, config=_config, orientation=orientation, allow_placeholder=False
+        )
+        if not path:
+            logger.warning(f"Background pool {orientation}/{family}: generation failed, stopping refill.")
+            break
+        os.replace(path, os.path.join(pool_dir, os.path.basename(path)))
+        added += 1
+    return added
+
+def _run_worker(keys):
+    for orientation, family in keys:
+        try:
+            added = fill(orientation, family)
+            if added:
+                logger.info(f"Background pool {orientation}/{family}: prefetched {added} image(s).")
+        except Exception as e:
+            logger.warning(f"Background pool refill failed for {orientation}/{family}: {e}")
+
+def start_worker(keys=(SHORTS_KEY,)):
+    """
+    Tops the given pools up on a daemon thread (one refill at a time; a call while
+    a refill is running is a no-op). Started after a pop() and once a run's render
+    is done, never while the pipeline may still need the image providers. The
+    refill overlaps the upload; call wait() before the process exits so it gets
+    to finish. Returns the thread, or None.
+    """
+    global _worker
+    if not _settings['enabled']:
+        return None
+    with _lock:
+        if _worker and _worker.is_alive():
+            return _worker
+        _worker = threading.Thread(target=_run_worker, args=(list(keys),), name="background-pool", daemon=True)
+        _worker.start()
+        return _worker
+
+def wait(timeout=None):
+    """
+    Joins a running refill for up to timeout seconds (join_seconds by default).
+    Whatever is still unfinished after that is dropped with the daemon thread at exit.
+    Returns True if no refill is left running.
+    """
+    worker = _worker
+    if not worker or not worker.is_alive():
+        return True
+    timeout = _settings['join_seconds'] if timeout is None else timeout
+    logger.info(f"Waiting up to {timeout}s for the background pool refill to finish...")
+    worker.join(timeout)
+    if worker.is_alive():
+        logger.warning("Background pool refill still running; leaving it to be cut off at exit.")
+        return False
+    return True
+
+if __name__ == "__main__":
+    # Fill every pool up front, e.g. from a scheduled job
+    import yaml
+    logging.basicConfig(level=logging.INFO)
+    config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'settings.yaml')
+    with open(config_path, 'r') as f:
+        configure(yaml.safe_load(f))
+    _run_worker([SHORTS_KEY, LONG_FORM_KEY])
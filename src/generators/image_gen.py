@@ -7,6 +7,23 @@ import urllib.parse
 
 logger = logging.getLogger(__name__)
 
+# Prompt families for background images. Generic abstract prompts WITHOUT the topic
+# name, to avoid text in images. "abstract" is used for Shorts, "cinematic" for long-form.
+PROMPT_FAMILIES = {
+    "abstract": [
+        "abstract gradient background, soft colors, inspirational atmosphere",
+        "minimalist background, smooth gradients, calming colors",
+        "cinematic lighting, abstract shapes, inspirational mood",
+        "soft bokeh background, dreamy atmosphere, elegant composition",
+        "abstract waves, flowing colors, peaceful ambiance"
+    ],
+    "cinematic": [
+        "cinematic landscape, abstract digital art, hyperrealistic, 8k",
+        "peaceful nature scene, morning mist, 16:9 resolution, elegant",
+        "outer space galaxy, nebula, vibrant colors, cinematic lighting"
+    ],
+}
+
 def generate_pollinations(prompt, output_dir="assets/temp", width=768, height=1024):
     """
     Generates image using Pollinations.ai (Free, no API key required).
@@ -146,13 +163,14 @@ def generate_stable_diffusion(prompt, output_dir="assets/temp", api_url="http://
         logger.warning(f"Local Stable Diffusion failed: {e}")
         return None
 
-def generate_background(prompt, output_dir="assets/temp", config=None, width=768, height=1024):
+def generate_background(prompt, output_dir="assets/temp", config=None, width=768, height=1024, orientation=None, allow_placeholder=True):
     """
     Generates a background image using cascading fallback system:
     1. Pollinations.ai (Free, no API key) - PRIMARY
     2. Hugging Face (Optional API key) - SECONDARY
     3. Local Stable Diffusion (Requires GPU) - TERTIARY
-    4. Gradient fallback - LAST RESORT
+    4. Gradient fallback - LAST RESORT (skipped if allow_placeholder is False)
+    orientation: 'landscape' swaps the configured (portrait) size.
     """
     logger.info(f"Starting image generation for prompt: {prompt}")
     
@@ -168,6 +186,9 @@ def generate_background(prompt, output_dir="assets/temp", config=None, width=768
         sd_url = image_config.get('stable_diffusion_url', sd_url)
         width = image_config.get('width', width)
         height = image_config.get('height', height)
+
+    if orientation == "landscape" and height > width:
+        width, height = height, width
     
     # Try methods in order
     result = None
@@ -190,45 +211,21 @@ def generate_background(prompt, output_dir="assets/temp", config=None, width=768
         return result
     
     # 4. Final fallback - Gradient
+    if not allow_placeholder:
+        logger.warning("All AI image generation methods failed.")
+        return None
     logger.warning("All AI image generation methods failed. Using gradient fallback.")
     return generate_placeholder(prompt, output_dir=output_dir, width=width, height=height)
 
-def generate_placeholder(prompt, output_dir="assets/temp", width=768, height=1024):
-    """Generates a simple gradient background using Pillow."""
-    try:
-        from PIL import Image, ImageDraw
-        import colorsys
-        import random
-        
-        logger.info("Generating fallback gradient image...")
-        
-        # Random hue
-        h1 = random.random()
-        h2 = (h1 + 0.5) % 1.0
-        c1 = tuple(int(c*255) for c in colorsys.hsv_to_rgb(h1, 0.6, 0.4)) # Darker
-        c2 = tuple(int(c*255) for c in colorsys.hsv_to_rgb(h2, 0.6, 0.6))
-        
-        base = Image.new('RGB', (width, height), c1)
-        top = Image.new('RGB', (width, height), c2)
-        mask = Image.new('L', (width, height))
-        mask_data = []
-        for y in range(height):
-            mask_data.extend([int(255 * (y / height))] * width)
-        mask.putdata(mask_data)
-        
-        final_img = Image.composite(top, base, mask)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"bg_fallback_{timestamp}.png"
-        filepath = os.path.join(output_dir, filename)
-        
-        final_img.save(filepath)
-        logger.info(f"Fallback image saved to {filepath}")
-        return filepath
-        
-    except Exception as e:
-        logger.error(f"Failed to generate fallback image: {e}")
-        return None
+def generate_placeholder(prompt, output_dir="assets/temp", width=768, height=1024, seed=None, style=None):
+    """
+    Offline fallback: a procedural background (gradient, radial, noise or bokeh)
+    rendered with NumPy. Pass a seed for a reproducible image.
+    """
+    from src.generators import procedural_bg
+
+    logger.info("Generating fallback procedural image...")
+    return procedural_bg.generate(output_dir=output_dir, width=width, height=height, style=style, seed=seed)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,136 @@
+import os
+import math
+import colorsys
+import logging
+from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STYLES = ("gradient", "radial", "noise", "bokeh")
+
+def _palette(rng):
+    """Two related colors (complementary-ish hues) as float RGB arrays in 0..1."""
+    h1 = rng.random()
+    h2 = (h1 + rng.uniform(0.3, 0.6)) % 1.0
+    dark = np.array(colorsys.hsv_to_rgb(h1, rng.uniform(0.5, 0.8), rng.uniform(0.2, 0.4)), dtype=np.float32)
+    light = np.array(colorsys.hsv_to_rgb(h2, rng.uniform(0.4, 0.7), rng.uniform(0.5, 0.75)), dtype=np.float32)
+    return dark, light
+
+def _coords(width, height):
+    """Pixel centers normalized to 0..1: a (1, width) row and a (height, 1) column that broadcast."""
+    x = (np.arange(width, dtype=np.float32) + 0.5) / width
+    y = (np.arange(height, dtype=np.float32) + 0.5) / height
+    return x[None, :], y[:, None]
+
+def linear_gradient(width, height, angle):
+    """0..1 ramp across the frame in direction `angle` (radians)."""
+    x, y = _coords(width, height)
+    x, y = x * np.float32(math.cos(angle)), y * np.float32(math.sin(angle))
+    # Separable ramp: its extremes sit at the corners, so the range comes from the 1D ends
+    low = float(min(x[0, 0], x[0, -1]) + min(y[0, 0], y[-1, 0]))
+    span = max(float(max(x[0, 0], x[0, -1]) + max(y[0, 0], y[-1, 0])) - low, 1e-6)
+    return (x - low) / span + y / span
+
+def radial_gradient(width, height, cx=0.5, cy=0.5):
+    """0 at (cx, cy), 1 at the farthest corner; distances are aspect-correct."""
+    x, y = _coords(width, height)
+    aspect = width / height
+    dx2 = ((x - cx) * aspect) ** 2
+    dy2 = (y - cy) ** 2
+    d = np.sqrt(dx2 + dy2)
+    return d / max(float(np.sqrt(dx2.max() + dy2.max())), 1e-6)
+
+def value_noise(rng, width, height, cells=6, octaves=3):
+    """Smooth fractal noise in 0..1: random lattices bilinearly upsampled (smoothstep) and summed."""
+    total = np.zeros((height, width), dtype=np.float32)
+    amplitude, norm = 1.0, 0.0
+    for octave in range(octaves):
+        gw = cells * 2 ** octave + 1
+        gh = max(2, int(math.ceil((gw - 1) * height / width)) + 1)
+        grid = rng.random((gh, gw)).astype(np.float32)
+
+        xs = np.linspace(0, gw - 1, width, dtype=np.float32)
+        ys = np.linspace(0, gh - 1, height, dtype=np.float32)
+        x0 = np.minimum(xs.astype(np.int32), gw - 2)
+        y0 = np.minimum(ys.astype(np.int32), gh - 2)
+        fx = xs - x0
+        fy = (ys - y0)[:, None]
+        fx, fy = fx * fx * (3 - 2 * fx), fy * fy * (3 - 2 * fy)
+
+        # Separable: interpolate the small lattice along x first, then expand along y
+        rows = grid[:, x0] * (1 - fx) + grid[:, x0 + 1] * fx
+        total += amplitude * (rows[y0] * (1 - fy) + rows[y0 + 1] * fy)
+        norm += amplitude
+        amplitude *= 0.5
+    return total / norm
+
+def bokeh(rng, width, height, count=28):
+    """Soft out-of-focus light discs (0..1 intensity), each drawn only inside its bounding box."""
+    layer = np.zeros((height, width), dtype=np.float32)
+    short_side = min(width, height)
+    for _ in range(count):
+        radius = rng.uniform(0.03, 0.12) * short_side
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        x0, x1 = max(0, int(cx - radius)), min(width, int(cx + radius) + 1)
+        y0, y1 = max(0, int(cy - radius)), min(height, int(cy + radius) + 1)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        ys, xs = np.ogrid[y0:y1, x0:x1]
+        d = np.hypot(xs - cx, ys - cy) / radius
+        # Flat disc with a soft rim, like a defocused highlight
+        disc = np.clip((1.0 - d) / 0.25, 0.0, 1.0) * rng.uniform(0.15, 0.45)
+        layer[y0:y1, x0:x1] += disc
+    return np.clip(layer, 0.0, 1.0)
+
+def vignette(width, height, strength=0.45):
+    """Brightness multiplier: 1 in the center falling off towards the corners."""
+    return 1.0 - strength * radial_gradient(width, height) ** 2
+
+def render(width, height, style=None, seed=None):
+    """
+    Renders a procedural background as a (height, width, 3) uint8 RGB array.
+    style: one of STYLES (random if None). The same seed gives the same image.
+    """
+    rng = np.random.default_rng(seed)
+    style = style or STYLES[rng.integers(len(STYLES))]
+    dark, light = _palette(rng)
+
+    if style == "radial":
+        t = 1.0 - radial_gradient(width, height, rng.uniform(0.3, 0.7), rng.uniform(0.25, 0.6))
+    else:
+        t = linear_gradient(width, height, rng.uniform(0, 2 * math.pi))
+
+    if style == "noise":
+        t = 0.55 * t + 0.45 * value_noise(rng, width, height, cells=int(rng.integers(3, 8)))
+
+    image = dark + (light - dark) * t[..., None]
+
+    if style == "bokeh":
+        highlight = np.array(colorsys.hsv_to_rgb(rng.random(), 0.25, 1.0), dtype=np.float32)
+        image += bokeh(rng, width, height)[..., None] * highlight
+
+    # Vignette and a little grain (hides banding in the smooth ramps after the
+    # video encode), folded into one per-pixel scale in 0..255
+    scale = vignette(width, height) * np.float32(255)
+    scale += rng.standard_normal((height, width), dtype=np.float32) * np.float32(1.5)
+    image *= scale[..., None]
+    np.clip(image, 0, 255, out=image)
+    return (image + 0.5).astype(np.uint8)
+
+def generate(output_dir="assets/temp", width=1080, height=1920, style=None, seed=None):
+    """Renders a procedural background and saves it as a high-quality JPEG. Returns the path, or None."""
+    try:
+        from PIL import Image
+
+        pixels = render(width, height, style=style, seed=seed)
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filepath = os.path.join(output_dir, f"bg_procedural_{timestamp}.jpg")
+        # JPEG encodes far faster than PNG at this size; the grain keeps it free of banding
+        Image.fromarray(pixels, 'RGB').save(filepath, quality=95, subsampling=0)
+        logger.info(f"Procedural background ({style or 'random'} style, seed {seed}) saved to {filepath}")
+        return filepath
+    except Exception as e:
+        logger.error(f"Failed to generate procedural background: {e}")
+        return None
@@ -1,47 +1,258 @@
 import requests
 import random
 import os
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from src.utils import media_probe, clip_library
 
 logger = logging.getLogger(__name__)
 
 PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
+PEXELS_SEARCH_URL = "https://api.pexels.com/videos/search"
+
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 3
+# (connect, read) seconds; read is per chunk, not for the whole file
+DOWNLOAD_TIMEOUT = (10, 60)
+SEARCH_TIMEOUT = 15
+
+_thread_state = threading.local()
+
+def _session():
+    """One pooled keep-alive session per thread (requests.Session isn't thread-safe)."""
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_state.session = session
+    return session
+
+def _search_videos(query, orientation, per_page, page=1):
+    """
+    One page of Pexels video search results (raw JSON).
+    Served from the clip library while younger than its TTL; a stale cached page is
+    used if the API can't be reached.
+    """
+    cached = clip_library.get_search(query, orientation, per_page, page)
+    if cached is not None:
+        logger.info(f"Using cached Pexels search for '{query}' ({orientation}, page {page}).")
+        return cached
 
-def download_video(url, output_path):
-    """Download video from URL to file."""
     try:
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with open(output_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        return True
+        response = _session().get(
+            PEXELS_SEARCH_URL,
+            headers={"Authorization": PEXELS_API_KEY},
+            params={"query": query, "orientation": orientation, "per_page": per_page, "page": page, "size": "medium"},
+            timeout=SEARCH_TIMEOUT
+        )
+        response.raise_for_status()
+        data = response.json()
     except Exception as e:
-        logger.error(f"Failed to download video: {e}")
+        stale = clip_library.get_search(query, orientation, per_page, page, allow_stale=True)
+        if stale is None:
+            raise
+        logger.warning(f"Pexels search failed ({e}). Using stale cached results.")
+        return stale
+
+    clip_library.put_search(query, orientation, per_page, page, data)
+    return data
+
+def download_video(url, output_path):
+    """
+    Download video from URL to file.
+    Streams into `<output_path>.part` and renames it into place only when complete, so a
+    half-written clip never reaches ffmpeg. A leftover .part from an interrupted run (or a
+    failed attempt) is resumed with an HTTP Range request.
+    """
+    part_path = f"{output_path}.part"
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        try:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            with _session().get(url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT) as r:
+                if r.status_code == 416:
+                    # The part file already holds the whole clip
+                    os.replace(part_path, output_path)
+                    return True
+                r.raise_for_status()
+                if offset and r.status_code != 206:
+                    logger.info("Server ignored the Range request. Restarting download.")
+                    offset = 0
+                expected = r.headers.get('Content-Length')
+                expected = offset + int(expected) if expected else None
+
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+
+            size = os.path.getsize(part_path)
+            if expected is not None and size < expected:
+                raise IOError(f"connection closed at {size}/{expected} bytes")
+            os.replace(part_path, output_path)
+            return True
+        except Exception as e:
+            logger.warning(f"Download attempt {attempt}/{DOWNLOAD_RETRIES} failed for {os.path.basename(output_path)}: {e}")
+            if attempt < DOWNLOAD_RETRIES:
+                time.sleep(2 ** attempt)
+
+    logger.error(f"Failed to download video: {url}")
+    return False
+
+def verify_download(path):
+    """
+    Checks the downloaded file itself (not the Pexels metadata) with one cached probe.
+    Broken or truncated files are deleted so they never reach the composer.
+    """
+    info = media_probe.probe(path)
+    if not media_probe.is_valid_video(path):
+        logger.warning(f"Downloaded file {path} is not a usable video. Discarding.")
+        if os.path.exists(path):
+            os.remove(path)
         return False
+    video = info['video']
+    logger.info(f"Verified {os.path.basename(path)}: {video['width']}x{video['height']} {video['codec']} @ {video['fps'] or 0:.2f} fps, {info['duration']:.1f}s")
+    return True
 
-def get_video_background(query, output_dir="assets/temp", duration_min=10, orientation="portrait"):
+# An upscale this small is invisible after the vignette and encode
+RESOLUTION_TOLERANCE = 1.05
+
+def select_video_file(video_files, target_width=1080, target_height=1920, target_fps=None):
+    """
+    Picks the cheapest Pexels rendition that still covers the output frame:
+    the smallest file that needs no (real) upscale to fill target_width x target_height
+    at >= target_fps, preferring MP4 and the output orientation.
+    If no rendition is big enough, the largest one is used.
+    Returns the video_files entry, or None.
+    """
+    candidates = [vf for vf in video_files if vf.get('width') and vf.get('height')]
+    mp4_files = [vf for vf in candidates if vf.get('file_type') == 'video/mp4']
+    candidates = mp4_files or candidates
+    if not candidates:
+        return video_files[0] if video_files else None
+
+    target_landscape = target_width >= target_height
+
+    def rank(vf):
+        width, height = vf['width'], vf['height']
+        # Cover scaling (scale + center crop), as in the composers
+        upscale = max(target_width / width, target_height / height)
+        big_enough = upscale <= RESOLUTION_TOLERANCE
+        same_orientation = (width >= height) == target_landscape
+        fps = vf.get('fps')
+        fast_enough = not target_fps or not fps or fps >= target_fps - 0.5
+        pixels = width * height
+        return (
+            not big_enough,
+            not same_orientation,
+            not fast_enough,
+            pixels if big_enough else -pixels,
+            fps or 0,
+        )
+
+    return min(candidates, key=rank)
+
+# Pexels reports whole seconds; plan with a little slack so ranges stay inside the real clip
+DURATION_MARGIN = 0.5
+# Shortest piece of a clip worth cutting to
+MIN_SHOT_SECONDS = 3.0
+
+def plan_clip_coverage(videos, total_duration, min_shot_seconds=MIN_SHOT_SECONDS, rng=random):
+    """
+    Chooses the fewest Pexels videos whose `duration` covers total_duration without
+    looping (longest first), shuffles their playback order and gives each an in/out
+    range. The overshoot is trimmed from the end of the sequence, no piece shorter
+    than min_shot_seconds, and each trimmed clip starts at a random point in its slack.
+    If the videos can't cover the duration, all usable ones are returned in full.
+    Returns list of dicts: video (Pexels entry), in, out (seconds).
+    """
+    usable = [v for v in videos if (v.get('duration') or 0) - DURATION_MARGIN >= min_shot_seconds]
+    chosen = []
+    covered = 0.0
+    for video in sorted(usable, key=lambda v: v['duration'], reverse=True):
+        if covered >= total_duration:
+            break
+        chosen.append(video)
+        covered += video['duration'] - DURATION_MARGIN
+    rng.shuffle(chosen)
+
+    lengths = [v['duration'] - DURATION_MARGIN for v in chosen]
+    overshoot = covered - total_duration
+    for i in reversed(range(len(lengths))):
+        if overshoot <= 0:
+            break
+        cut = min(overshoot, lengths[i] - min_shot_seconds)
+        lengths[i] -= cut
+        overshoot -= cut
+
+    clips = []
+    for video, length in zip(chosen, lengths):
+        slack = video['duration'] - DURATION_MARGIN - length
+        start = rng.uniform(0.0, slack) if slack > 0 else 0.0
+        clips.append({"video": video, "in": start, "out": start + length})
+    return clips
+
+def _download_rendition(video_data, output_dir, target_width, target_height, target_fps):
+    best_file = select_video_file(video_data.get('video_files', []), target_width, target_height, target_fps)
+    if not best_file:
+        return None
+
+    if clip_library.is_enabled():
+        # Kept across runs, keyed by Pexels video id + rendition
+        output_path = clip_library.clip_path(video_data['id'], best_file)
+        if clip_library.lookup_clip(output_path) and media_probe.is_valid_video(output_path):
+            logger.info(f"Using background video {video_data['id']} from the clip library.")
+            return output_path
+    else:
+        # The rendition is part of the name, so a .part left by another rendition is never resumed into it
+        filename = f"bg_video_{video_data['id']}_{clip_library.rendition_key(best_file)}.mp4"
+        output_path = os.path.join(output_dir, filename)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    logger.info(
+        f"Downloading background video {video_data['id']} from Pexels "
+        f"({best_file.get('width')}x{best_file.get('height')} @ {best_file.get('fps') or '?'} fps rendition)..."
+    )
+    if download_video(best_file['link'], output_path) and verify_download(output_path):
+        if clip_library.is_enabled():
+            clip_library.add_clip(output_path)
+        return output_path
+    return None
+
+def _download_renditions(videos, output_dir, target_width, target_height, target_fps):
+    """
+    Downloads several videos concurrently on a bounded pool, so a batch takes about as
+    long as its slowest clip. Returns paths in the same order (None for failures).
+    """
+    if not videos:
+        return []
+    workers = min(DOWNLOAD_WORKERS, len(videos))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pexels-download") as pool:
+        return list(pool.map(
+            lambda video_data: _download_rendition(video_data, output_dir, target_width, target_height, target_fps),
+            videos
+        ))
+
+def get_video_background(query, output_dir="assets/temp", duration_min=10, orientation="portrait", target_width=1080, target_height=1920, target_fps=30):
     """
     Fetches a video from Pexels API matching the query.
     Orientation: 'portrait' (9:16) or 'landscape' (16:9)
+    target_*: output frame size and rate; the smallest rendition covering them is downloaded.
     Returns: Path to downloaded video file.
     """
     if not PEXELS_API_KEY:
         logger.warning("PEXELS_API_KEY not found. Fallback to image generation.")
         return None
 
-    headers = {
-        "Authorization": PEXELS_API_KEY
-    }
-    
-    # Search for vertical videos
-    # orientation=portrait ensures 9:16 usually, landscape ensures 16:9
-    search_url = f"https://api.pexels.com/videos/search?query={query}&orientation={orientation}&per_page=5&size=medium"
-
     try:
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        # Search for vertical videos
+        # orientation=portrait ensures 9:16 usually, landscape ensures 16:9
+        data = _search_videos(query, orientation, per_page=5)
         
         videos = data.get('videos', [])
         if not videos:
@@ -51,64 +262,29 @@ def get_video_background(query, output_dir="assets/temp", duration_min=10, orien
         # Select a random video
         video_data = random.choice(videos)
         
-        # Find best video file (closest to 1080x1920 or high quality)
-        video_files = video_data.get('video_files', [])
-        
-        # Sort by quality (width * height) descending
-        video_files.sort(key=lambda x: x['width'] * x['height'], reverse=True)
-        
-        best_file = None
-        # Prefer HD files without watermarks (Pexels is free/clean usually)
-        for vf in video_files:
-            # We prefer MP4
-            if vf['file_type'] == 'video/mp4':
-                best_file = vf
-                break
-        
-        if not best_file:
-            best_file = video_files[0] if video_files else None
-            
-        if not best_file:
-            return None
-            
-        video_url = best_file['link']
-        
-        os.makedirs(output_dir, exist_ok=True)
-        filename = f"bg_video_{video_data['id']}.mp4"
-        output_path = os.path.join(output_dir, filename)
-        
-        logger.info(f"Downloading background video {video_data['id']} from Pexels...")
-        if download_video(video_url, output_path):
+        output_path = _download_rendition(video_data, output_dir, target_width, target_height, target_fps)
+        if output_path:
             logger.info("✅ Video background downloaded successfully.")
-            return output_path
-        else:
-            return None
+        return output_path
 
     except Exception as e:
         logger.error(f"Pexels API error: {e}")
         return None
 
-def get_multiple_video_backgrounds(query, output_dir="assets/temp", count=3, orientation="landscape"):
+def get_multiple_video_backgrounds(query, output_dir="assets/temp", count=3, orientation="landscape", target_width=1920, target_height=1080, target_fps=30):
     """
     Fetches multiple videos from Pexels API.
     Orientation: 'portrait' (9:16) or 'landscape' (16:9)
+    target_*: output frame size and rate; the smallest rendition covering them is downloaded.
     Returns: List of paths to downloaded video files.
     """
     if not PEXELS_API_KEY:
         logger.warning("PEXELS_API_KEY not found. Fallback might be needed.")
         return []
 
-    headers = {
-        "Authorization": PEXELS_API_KEY
-    }
-    
-    # per_page slightly higher to allow filtering if needed
-    search_url = f"https://api.pexels.com/videos/search?query={query}&orientation={orientation}&per_page={count+5}&size=medium"
-
     try:
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        # per_page slightly higher to allow filtering if needed
+        data = _search_videos(query, orientation, per_page=count + 5)
         
         videos = data.get('videos', [])
         if not videos:
@@ -116,32 +292,48 @@ def get_multiple_video_backgrounds(query, output_dir="assets/temp", count=3, ori
             return []
             
         selected_videos = random.sample(videos, min(len(videos), count))
-        paths = []
+        paths = _download_renditions(selected_videos, output_dir, target_width, target_height, target_fps)
+        return [path for path in paths if path]
 
-        for video_data in selected_videos:
-            video_files = video_data.get('video_files', [])
-            video_files.sort(key=lambda x: x['width'] * x['height'], reverse=True)
-            
-            best_file = None
-            for vf in video_files:
-                if vf['file_type'] == 'video/mp4':
-                    best_file = vf
-                    break
-            
-            if not best_file and video_files:
-                best_file = video_files[0]
-                
-            if best_file:
-                os.makedirs(output_dir, exist_ok=True)
-                filename = f"bg_video_{video_data['id']}.mp4"
-                output_path = os.path.join(output_dir, filename)
-                
-                logger.info(f"Downloading background video {video_data['id']} from Pexels...")
-                if download_video(best_file['link'], output_path):
-                    paths.append(output_path)
-        
-        return paths
+    except Exception as e:
+        logger.error(f"Pexels API error: {e}")
+        return []
 
+def get_video_backgrounds_for_duration(query, total_duration, output_dir="assets/temp", orientation="landscape", target_width=1920, target_height=1080, target_fps=30, per_page=15, max_pages=3):
+    """
+    Fetches just enough Pexels videos to cover total_duration seconds (see plan_clip_coverage).
+    Further result pages are requested only while the candidates fall short.
+    Returns list of dicts: path, in, out (the part of each clip to show, in playback order).
+    """
+    if not PEXELS_API_KEY:
+        logger.warning("PEXELS_API_KEY not found. Fallback might be needed.")
+        return []
+
+    candidates = {}
+    clips = []
+    try:
+        for page in range(1, max_pages + 1):
+            data = _search_videos(query, orientation, per_page, page)
+
+            for video_data in data.get('videos', []):
+                candidates.setdefault(video_data['id'], video_data)
+            clips = plan_clip_coverage(list(candidates.values()), total_duration)
+            covered = sum(clip['out'] - clip['in'] for clip in clips)
+            if covered >= total_duration - 1e-6 or not data.get('next_page'):
+                break
+            logger.info(f"Pexels clips cover {covered:.0f}s of {total_duration:.0f}s. Fetching page {page + 1}...")
     except Exception as e:
         logger.error(f"Pexels API error: {e}")
+
+    if not clips:
+        logger.warning(f"No usable videos found for query: {query}")
         return []
+
+    covered = sum(clip['out'] - clip['in'] for clip in clips)
+    logger.info(f"Planned {len(clips)} background clip(s) covering {covered:.1f}s of {total_duration:.1f}s.")
+
+    paths = _download_renditions([clip['video'] for clip in clips], output_dir, target_width, target_height, target_fps)
+    return [
+        {"path": path, "in": clip['in'], "out": clip['out']}
+        for clip, path in zip(clips, paths) if path
+    ]
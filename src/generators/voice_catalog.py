@@ -0,0 +1,146 @@
+import os
+import pickle
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+VOICES_FILE = os.path.join(ROOT_DIR, "voices.txt")
+CACHE_FILE = os.path.join(ROOT_DIR, "assets", "cache", "voice_catalog.pickle")
+
+# Bump when the pickled layout changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+def _read_table(path):
+    """voices.txt is the UTF-16 output of `edge-tts --list-voices`."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    for encoding in ("utf-16", "utf-8-sig"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"Cannot decode voice table: {path}")
+
+def parse_voices_table(text):
+    """
+    Parses the fixed-width voice table into a list of voice dicts.
+    Column spans are taken from the '-----' separator row.
+    """
+    lines = [line.rstrip("\r") for line in text.splitlines() if line.strip()]
+    sep_index = next((i for i, line in enumerate(lines) if set(line.replace(" ", "")) == {"-"}), None)
+    if sep_index is None:
+        raise ValueError("Voice table has no header separator row")
+
+    # Start offsets of each dashed column
+    sep = lines[sep_index]
+    starts = [i for i, ch in enumerate(sep) if ch == "-" and (i == 0 or sep[i - 1] == " ")]
+    spans = list(zip(starts, starts[1:] + [None]))
+
+    voices = []
+    for line in lines[sep_index + 1:]:
+        cols = [line[a:b].strip() for a, b in spans]
+        if len(cols) < 4 or not cols[0]:
+            continue
+        name, gender, categories, personalities = cols[:4]
+        voices.append({
+            "name": name,
+            "locale": name.rsplit("-", 1)[0],
+            "gender": gender.lower(),
+            "categories": tuple(c.strip().lower() for c in categories.split(",") if c.strip()),
+            "personalities": tuple(p.strip().lower() for p in personalities.split(",") if p.strip()),
+        })
+    return voices
+
+class VoiceCatalog:
+    """In-memory voice indexes by locale, gender, category and personality."""
+
+    def __init__(self, voices):
+        self.voices = {v["name"]: v for v in voices}
+        self.by_locale = {}
+        self.by_gender = {}
+        self.by_locale_gender = {}
+        self.by_category = {}
+        self.by_personality = {}
+        for v in voices:
+            self.by_locale.setdefault(v["locale"], []).append(v["name"])
+            self.by_gender.setdefault(v["gender"], []).append(v["name"])
+            self.by_locale_gender.setdefault((v["locale"], v["gender"]), []).append(v["name"])
+            for c in v["categories"]:
+                self.by_category.setdefault(c, set()).add(v["name"])
+            for p in v["personalities"]:
+                self.by_personality.setdefault(p, set()).add(v["name"])
+
+    def __contains__(self, name):
+        return name in self.voices
+
+    def __len__(self):
+        return len(self.voices)
+
+    def get(self, name):
+        return self.voices.get(name)
+
+    def locales(self):
+        return sorted(self.by_locale)
+
+    def find(self, locale=None, gender=None, category=None, personality=None):
+        """
+        Returns voice names matching all given filters (table order preserved).
+        locale/gender are direct index hits; category/personality narrow via set lookups.
+        """
+        gender = gender.lower() if gender else None
+        if locale and gender:
+            names = self.by_locale_gender.get((locale, gender), [])
+        elif locale:
+            names = self.by_locale.get(locale, [])
+        elif gender:
+            names = self.by_gender.get(gender, [])
+        else:
+            names = list(self.voices)
+
+        if category:
+            allowed = self.by_category.get(category.lower(), set())
+            names = [n for n in names if n in allowed]
+        if personality:
+            allowed = self.by_personality.get(personality.lower(), set())
+            names = [n for n in names if n in allowed]
+        return names
+
+def _source_signature(path):
+    st = os.stat(path)
+    return (CACHE_VERSION, st.st_size, st.st_mtime_ns)
+
+def load_catalog(voices_file=VOICES_FILE, cache_file=CACHE_FILE):
+    """
+    Loads the precompiled catalog from the pickle cache, rebuilding it
+    from voices.txt whenever the source file changes.
+    """
+    signature = _source_signature(voices_file)
+
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("signature") == signature:
+                return cached["catalog"]
+        except Exception as e:
+            logger.warning(f"Voice catalog cache unreadable, rebuilding: {e}")
+
+    catalog = VoiceCatalog(parse_voices_table(_read_table(voices_file)))
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "wb") as f:
+            pickle.dump({"signature": signature, "catalog": catalog}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Voice catalog compiled: {len(catalog)} voices, {len(catalog.by_locale)} locales.")
+    except Exception as e:
+        logger.warning(f"Failed to write voice catalog cache: {e}")
+    return catalog
+
+_catalog = None
+
+def get_catalog():
+    """Process-wide catalog, loaded once."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
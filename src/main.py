@@ -18,10 +18,10 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import time
 import requests
 
-from src.generators import quote_gen, image_gen, audio_gen, video_gen
-from src.video import composer
-from src.upload import youtube_api, drive_api
-from src.utils import music_loader
+from src.generators import quote_gen, image_gen, audio_gen, video_gen, background_pool
+from src.video import composer, render_profiles, animated_bg
+from src.upload import upload_stage, resumable_upload
+from src.utils import music_loader, font_setup, ffmpeg_runner, clip_library
 
 # Setup Logging
 logging.basicConfig(
@@ -68,13 +68,18 @@ def cleanup(files):
                 logger.warning(f"Failed to delete {f}: {e}")
 
 def main():
+    # Loaded first: the --profile choices come from render.profiles
+    config = load_config()
     parser = argparse.ArgumentParser(description="Automated YouTube Shorts Generator")
     parser.add_argument("--dry-run", action="store_true", help="Generate video but do NOT upload")
     parser.add_argument("--topic", type=str, help="Specific topic for quote")
     parser.add_argument("--keep-temps", action="store_true", help="Do not delete temporary assets")
+    parser.add_argument("--profile", type=str, choices=render_profiles.profile_names(config), help="Render profile from settings.yaml (default: render.default_profile)")
+    parser.add_argument("--sidecar-captions", action="store_true", help="Show the quote card instead of burned-in subtitles (caption tracks are long-form only)")
     args = parser.parse_args()
 
-    config = load_config()
+    caption_config = config.get('captions', {})
+    sidecar_captions = args.sidecar_captions or caption_config.get('mode') == "sidecar"
     
     # 0. Pre-flight Checks
     import subprocess
@@ -124,11 +129,35 @@ def main():
     # 1. Ensure Music Assets
     music_loader.ensure_music_assets(config['paths']['music'])
 
+    # 1.1 Resolve fonts once (bundled fontsdir + persistent fontconfig cache)
+    font_setup.get_font_setup(fonts_dir=config['paths'].get('fonts', 'assets/fonts'))
+
+    # 1.2 Progress logging + stall/deadline watchdog for every ffmpeg encode
+    ffmpeg_runner.configure(config.get('ffmpeg'))
+
+    # 1.3 Persistent background clip library (search cache + LRU clip store)
+    clip_library.configure(config.get('background_library'))
+
+    # 1.4 Fallback background images kept ready between runs (refilled once the render is done)
+    background_pool.configure(config)
+
+    # 1.5 Chunked resumable uploads: finish any upload an interrupted earlier run left behind
+    resumable_upload.configure(config['upload'].get('resumable'))
+    if not args.dry_run:
+        for file_path, resumed in upload_stage.resume_pending().items():
+            if not args.keep_temps:
+                upload_stage.release_files(file_path, [
+                    resumed['thumbnail_path'], resumed['caption_path'],
+                    f"{os.path.splitext(file_path)[0]}_preview.mp4"
+                ])
+
     # 2. Select Topic
     topic = args.topic if args.topic else random.choice(TOPICS)
     logger.info(f"Starting pipeline for topic: {topic}")
 
     temp_files = []
+    # Resolved up front: backgrounds are fetched at the rendition the encode needs
+    render_profile = render_profiles.get_render_profile(args.profile, config, orientation="portrait")
 
     try:
         # 2. Generate Quote
@@ -145,42 +174,54 @@ def main():
         # 3. Generate Background (Video preferred, Image fallback)
         background_video = None
         image_path = None
+        animated_background = None
+        animated_fallback = config.get('video', {}).get('offline_background', 'animated') == 'animated'
         
         # Try Video First
         try:
             # Search query based on topic + abstract keywords
             video_query = f"{topic} nature abstract"
-            background_video = video_gen.get_video_background(video_query, output_dir=config['paths']['temp'])
+            background_video = video_gen.get_video_background(
+                video_query,
+                output_dir=config['paths']['temp'],
+                target_width=render_profile['width'],
+                target_height=render_profile['height'],
+                target_fps=render_profile['fps']
+            )
         except Exception as e:
             logger.warning(f"Video generation failed: {e}")
             
         if background_video:
-            temp_files.append(background_video)
+            if not clip_library.owns(background_video):
+                temp_files.append(background_video)
             logger.info(f"Using video background: {background_video}")
         else:
-            # Fallback to Image
+            # Fallback to Image: prefetched if available, generated live otherwise
             logger.info("Fallback to Image Generation...")
-            # Use generic abstract prompts WITHOUT topic name to avoid text in images
-            abstract_prompts = [
-                "abstract gradient background, soft colors, inspirational atmosphere",
-                "minimalist background, smooth gradients, calming colors",
-                "cinematic lighting, abstract shapes, inspirational mood",
-                "soft bokeh background, dreamy atmosphere, elegant composition",
-                "abstract waves, flowing colors, peaceful ambiance"
-            ]
-            image_prompt = random.choice(abstract_prompts)
-            image_path = image_gen.generate_background(image_prompt, output_dir=config['paths']['temp'], config=config)
+            image_path = background_pool.pop(*background_pool.SHORTS_KEY, output_dir=config['paths']['temp'])
             if not image_path:
+                image_prompt = random.choice(image_gen.PROMPT_FAMILIES["abstract"])
+                image_path = image_gen.generate_background(
+                    image_prompt, output_dir=config['paths']['temp'], config=config, allow_placeholder=not animated_fallback
+                )
+            if image_path:
+                temp_files.append(image_path)
+            elif animated_fallback:
+                # No clip and no image: generate the background inside the render graph
+                animated_background = {"seed": animated_bg.seed_for(topic)}
+                logger.info(f"Using animated background (seed {animated_background['seed']}).")
+            else:
                 logger.error("Failed to generate image. Aborting.")
                 return
-            temp_files.append(image_path)
 
         # 4. Generate Voiceover and Captions
         audio_path, word_boundaries, sanitized_quote = audio_gen.generate_voiceover(
             quote,
             output_dir=config['paths']['temp'],
             specific_gender="male",
-            style="elderly"
+            style="elderly",
+            locale=config['audio'].get('locale', 'en-US'),
+            config=config
         )
 
         if not audio_path:
@@ -191,14 +232,16 @@ def main():
         
         # 4.1 Generate Karaoke Subtitles (ASS format)
         subtitle_path = None
-        if word_boundaries:
+        if word_boundaries and sidecar_captions:
+            # Without subtitles the Short shows the static quote card, which already carries
+            # the text; a caption track on top would show it twice, so none is uploaded
+            logger.info("Sidecar captions are for long-form videos; using the quote card layout.")
+        elif word_boundaries:
             from src.utils import subtitle_utils
             
-            # Calculate estimated video duration to keep captions until the very end
-            # Logic mirrored from composer.py
-            voice_duration = composer.get_audio_duration(audio_path)
-            base_duration = max(voice_duration + 3.0, 8.0)
-            est_video_duration = min(base_duration, 40.0)
+            # Video duration to keep captions until the very end
+            # (audio analysis is cached, so composer reuses it without re-probing)
+            est_video_duration = composer.get_video_duration(audio_path)
             
             # Use sanitized quote for keyword extraction to match word boundaries
             words_to_check = sanitized_quote.split()
@@ -218,6 +261,10 @@ def main():
         # 5. Compose Video
         music_dir = config['paths']['music']
         output_file = os.path.join(config['paths']['output'], f"short_{random.randint(1000,9999)}.mp4")
+        render_config = config.get('render', {})
+        output_stem = os.path.splitext(output_file)[0]
+        thumbnail_path = f"{output_stem}_thumb.jpg" if render_config.get('thumbnail', True) else None
+        preview_path = f"{output_stem}_preview.mp4" if render_config.get('preview', False) else None
         
         final_video_path = composer.create_video(
             image_path=image_path,
@@ -226,7 +273,14 @@ def main():
             music_dir=music_dir,
             output_file=output_file,
             subtitle_path=subtitle_path,
-            background_video_path=background_video
+            background_video_path=background_video,
+            render_profile=render_profile,
+            ducking=config['audio'].get('ducking', False),
+            thumbnail_path=thumbnail_path,
+            thumbnail_at=render_config.get('thumbnail_at', 0.3),
+            preview_path=preview_path,
+            mezzanine_cache=render_config.get('mezzanine_cache', False),
+            animated_background=animated_background
         )
         
         if not final_video_path:
@@ -234,41 +288,41 @@ def main():
             sys.exit(1)
         
         logger.info(f"Video generated at: {final_video_path}")
+        # Top the fallback pool up while uploading; nothing needs the image providers any more
+        background_pool.start_worker([background_pool.SHORTS_KEY])
 
-        # 6. Upload to YouTube
+        # 6. Upload to YouTube and Google Drive (backup)
         if not args.dry_run:
             logger.info("Starting upload process...")
             title = f"Daily {topic.capitalize()} Quote #shorts #motivation"
             description = config['upload']['description_template'].format(quote=quote)
             tags = ["shorts", "motivation", "inspiration", topic, "quotes"]
             
-            video_id = youtube_api.upload_video(
-                final_video_path, 
-                title, 
-                description, 
-                tags, 
-                privacy_status=config['upload']['privacy_status']
+            # YouTube (with thumbnail) and the Drive backup upload concurrently
+            uploads = upload_stage.upload(
+                final_video_path,
+                title,
+                description,
+                tags,
+                privacy_status=config['upload']['privacy_status'],
+                thumbnail_path=thumbnail_path
             )
             
+            video_id = uploads['youtube']
             if video_id:
                 logger.info(f"Successfully uploaded! URL: https://youtube.com/shorts/{video_id}")
             else:
                 logger.error("YouTube Upload failed.")
-            # 7. Upload to Google Drive (Backup/Sharing)
-            logger.info("Starting Google Drive upload...")
-            drive_link = drive_api.upload_file(final_video_path)
+            drive_link = uploads['drive']
             if drive_link:
                 logger.info(f"Backup uploaded to Drive: {drive_link}")
             else:
                 logger.warning("Google Drive upload failed.")
 
             # Final Cleanup of Video File
-            if not args.keep_temps and os.path.exists(final_video_path):
-                try:
-                    os.remove(final_video_path)
-                    logger.info(f"Deleted uploaded video file: {final_video_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete video file: {e}")
+            # Kept only while a saved session can resume the upload next run
+            if not args.keep_temps:
+                upload_stage.release_files(final_video_path, [thumbnail_path, preview_path])
         else:
             logger.info("Dry run enabled. Skipping uploads.")
 
@@ -278,6 +332,11 @@ def main():
     finally:
         if not args.keep_temps:
             cleanup(temp_files)
+        # Evicted only now, so no clip this run fetched is deleted before the render reads it
+        if clip_library.is_enabled():
+            clip_library.evict()
+        # The refill started after the render runs alongside the upload; let it finish
+        background_pool.wait()
 
 if __name__ == "__main__":
     main()
@@ -14,10 +14,10 @@ warnings.filterwarnings("ignore", category=FutureWarning, module="google.generat
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.generators import long_form_gen, image_gen, audio_gen, video_gen
-from src.video import long_composer
-from src.upload import youtube_api, drive_api
-from src.utils import music_loader, subtitle_utils
+from src.generators import long_form_gen, image_gen, audio_gen, video_gen, background_pool
+from src.video import long_composer, render_profiles, animated_bg
+from src.upload import upload_stage, resumable_upload
+from src.utils import music_loader, subtitle_utils, font_setup, ffmpeg_runner, clip_library
 
 # Setup Logging
 logging.basicConfig(
@@ -52,13 +52,18 @@ def cleanup(files):
                 logger.warning(f"Failed to delete {f}: {e}")
 
 def main():
+    # Loaded first: the --profile choices come from render.profiles
+    config = load_config()
     parser = argparse.ArgumentParser(description="Automated YouTube Long-form Video Generator")
     parser.add_argument("--dry-run", action="store_true", help="Generate video but do NOT upload")
     parser.add_argument("--topic", type=str, help="Specific topic for the video")
     parser.add_argument("--keep-temps", action="store_true", help="Do not delete temporary assets")
+    parser.add_argument("--profile", type=str, choices=render_profiles.profile_names(config), help="Render profile from settings.yaml (default: render.default_profile)")
+    parser.add_argument("--sidecar-captions", action="store_true", help="Upload SRT/VTT caption tracks instead of burning subtitles in")
     args = parser.parse_args()
 
-    config = load_config()
+    caption_config = config.get('captions', {})
+    sidecar_captions = args.sidecar_captions or caption_config.get('mode') == "sidecar"
     
     # 0. Check FFmpeg
     try:
@@ -70,11 +75,35 @@ def main():
     # 1. Ensure Music Assets
     music_loader.ensure_music_assets(config['paths']['music'])
 
+    # 1.1 Resolve fonts once (bundled fontsdir + persistent fontconfig cache)
+    font_setup.get_font_setup(fonts_dir=config['paths'].get('fonts', 'assets/fonts'))
+
+    # 1.2 Progress logging + stall/deadline watchdog for every ffmpeg encode
+    ffmpeg_runner.configure(config.get('ffmpeg'))
+
+    # 1.3 Persistent background clip library (search cache + LRU clip store)
+    clip_library.configure(config.get('background_library'))
+
+    # 1.4 Fallback background images kept ready between runs (refilled once the render is done)
+    background_pool.configure(config)
+
+    # 1.5 Chunked resumable uploads: finish any upload an interrupted earlier run left behind
+    resumable_upload.configure(config['upload'].get('resumable'))
+    if not args.dry_run:
+        for file_path, resumed in upload_stage.resume_pending().items():
+            if not args.keep_temps:
+                upload_stage.release_files(file_path, [
+                    resumed['thumbnail_path'], resumed['caption_path'],
+                    f"{os.path.splitext(file_path)[0]}_preview.mp4"
+                ])
+
     # 2. Select Topic
     topic = args.topic if args.topic else random.choice(TOPICS)
     logger.info(f"Starting long-form pipeline for topic: {topic}")
 
     temp_files = []
+    # Resolved up front: backgrounds are fetched at the rendition the encode needs
+    render_profile = render_profiles.get_render_profile(args.profile, config, orientation="landscape")
 
     try:
         # 2. Generate Long-form Script
@@ -87,60 +116,80 @@ def main():
         explanation = script['explanation']
         full_text = script['full_text']
 
-        # 3. Generate Background Video (Landscape 16:9)
-        background_videos = []
+        # 3. Generate Voiceover (first: its length sizes the background plan)
+        logger.info("Generating long-form voiceover...")
+        audio_path, word_boundaries, sanitized_text = audio_gen.generate_voiceover(
+            full_text,
+            output_dir=config['paths']['temp'],
+            style="elderly",
+            long_form=True,
+            locale=config['audio'].get('locale', 'en-US'),
+            config=config
+        )
+
+        if not audio_path:
+            logger.error("Failed to generate voiceover. Aborting.")
+            return
+
+        temp_files.append(audio_path)
+        
+        # Calculate approximate duration for subtitles and the background plan
+        video_duration = long_composer.get_video_duration(audio_path)
+
+        # 4. Generate Background Video (Landscape 16:9)
+        # Planned from Pexels clip durations: just enough clips (and in/out ranges) to cover the voice
+        background_clips = []
+        animated_background = None
+        animated_fallback = config.get('video', {}).get('offline_background', 'animated') == 'animated'
         try:
             video_query = f"{topic} nature landscape abstract"
-            background_videos = video_gen.get_multiple_video_backgrounds(
+            background_clips = video_gen.get_video_backgrounds_for_duration(
                 video_query, 
+                video_duration,
                 output_dir=config['paths']['temp'],
-                count=5,
-                orientation="landscape"
+                orientation="landscape",
+                target_width=render_profile['width'],
+                target_height=render_profile['height'],
+                target_fps=render_profile['fps']
             )
         except Exception as e:
             logger.warning(f"Video background search failed: {e}")
             
-        if background_videos:
-            temp_files.extend(background_videos)
+        if background_clips:
+            temp_files.extend(clip['path'] for clip in background_clips if not clip_library.owns(clip['path']))
             image_path = None
         else:
-            # Fallback to image (16:9)
+            # Fallback to image (16:9): prefetched if available, generated live otherwise
             logger.info("Fallback to Image Generation...")
-            abstract_prompts = [
-                "cinematic landscape, abstract digital art, hyperrealistic, 8k",
-                "peaceful nature scene, morning mist, 16:9 resolution, elegant",
-                "outer space galaxy, nebula, vibrant colors, cinematic lighting"
-            ]
-            image_prompt = random.choice(abstract_prompts)
-            image_path = image_gen.generate_background(image_prompt, output_dir=config['paths']['temp'], config=config)
+            image_path = background_pool.pop(*background_pool.LONG_FORM_KEY, output_dir=config['paths']['temp'])
             if not image_path:
+                image_prompt = random.choice(image_gen.PROMPT_FAMILIES["cinematic"])
+                image_path = image_gen.generate_background(
+                    image_prompt, output_dir=config['paths']['temp'], config=config, orientation="landscape",
+                    allow_placeholder=not animated_fallback
+                )
+            if image_path:
+                temp_files.append(image_path)
+            elif animated_fallback:
+                # No clips and no image: generate the background inside the render graph
+                animated_background = {"seed": animated_bg.seed_for(topic)}
+                logger.info(f"Using animated background (seed {animated_background['seed']}).")
+            else:
                 logger.error("Failed to generate visual background. Aborting.")
                 return
-            temp_files.append(image_path)
-
-
-        # 4. Generate Voiceover
-        logger.info("Generating long-form voiceover...")
-        audio_path, word_boundaries, sanitized_text = audio_gen.generate_voiceover(
-            full_text,
-            output_dir=config['paths']['temp'],
-            style="elderly",
-            long_form=True
-        )
-
-        if not audio_path:
-            logger.error("Failed to generate voiceover. Aborting.")
-            return
-
-        temp_files.append(audio_path)
-        
-        # Calculate approximate duration for subtitles
-        voice_duration = long_composer.get_audio_duration(audio_path)
-        video_duration = voice_duration + 2.0
         
-        # 5. Generate Karaoke Subtitles (ASS format, 1920x1080)
+        # 5. Generate Karaoke Subtitles (ASS format, 1920x1080) or sidecar caption tracks
+        # Sidecar mode skips the subtitles filter, so libass is out of the encode loop
         subtitle_path = None
-        if word_boundaries:
+        caption_tracks = {}
+        if word_boundaries and sidecar_captions:
+            caption_tracks = subtitle_utils.write_caption_tracks(
+                word_boundaries,
+                os.path.splitext(audio_path)[0],
+                formats=caption_config.get('formats', ["srt", "vtt"])
+            )
+            temp_files.extend(caption_tracks.values())
+        elif word_boundaries:
             ass_filename = audio_path.replace(".mp3", ".ass")
             subtitle_path = subtitle_utils.generate_karaoke_ass(
                 word_boundaries, 
@@ -156,6 +205,11 @@ def main():
         # 6. Compose Video
         output_file = os.path.join(config['paths']['output'], f"long_{random.randint(1000,9999)}.mp4")
         
+        render_config = config.get('render', {})
+        output_stem = os.path.splitext(output_file)[0]
+        thumbnail_path = f"{output_stem}_thumb.jpg" if render_config.get('thumbnail', True) else None
+        preview_path = f"{output_stem}_preview.mp4" if render_config.get('preview', False) else None
+
         final_video_path = long_composer.create_long_video(
             audio_path=audio_path,
             quote_text=quote,
@@ -163,8 +217,17 @@ def main():
             music_dir=config['paths']['music'],
             output_file=output_file,
             subtitle_path=subtitle_path,
-            background_video_paths=background_videos,
-            image_path=image_path if not background_videos else None
+            background_clips=background_clips,
+            image_path=image_path if not background_clips else None,
+            render_profile=render_profile,
+            parallel_segments=render_config.get('parallel_segments', 0),
+            min_segment_seconds=render_config.get('min_segment_seconds', 20),
+            ducking=config['audio'].get('ducking', False),
+            thumbnail_path=thumbnail_path,
+            thumbnail_at=render_config.get('thumbnail_at', 0.3),
+            preview_path=preview_path,
+            mezzanine_cache=render_config.get('mezzanine_cache', False),
+            animated_background=animated_background
         )
         
         if not final_video_path:
@@ -172,33 +235,42 @@ def main():
             return
         
         logger.info(f"Long-form video generated at: {final_video_path}")
+        # Top the fallback pool up while uploading; nothing needs the image providers any more
+        background_pool.start_worker([background_pool.LONG_FORM_KEY])
 
-        # 7. Upload to YouTube
+        # 7. Upload to YouTube and Google Drive (backup)
         if not args.dry_run:
             logger.info("Starting upload process...")
             title = f"Finding Peace in {topic.capitalize()}: A Life Lesson"
             description = f"Today we explore {topic} through a powerful quote and a detailed explanation.\n\n{full_text}\n\n#motivation #wisdom #{topic}"
             tags = ["motivation", "wisdom", "inspiration", topic, "meditation"]
             
-            video_id = youtube_api.upload_video(
-                final_video_path, 
-                title, 
-                description, 
-                tags, 
-                privacy_status=config['upload']['privacy_status']
+            # YouTube (with thumbnail and captions) and the Drive backup upload concurrently
+            caption_path = caption_tracks.get(caption_config.get('upload_format', "srt"))
+            # Released with the video: an interrupted upload resumes with it next run
+            temp_files = [f for f in temp_files if f != caption_path]
+            uploads = upload_stage.upload(
+                final_video_path,
+                title,
+                description,
+                tags,
+                privacy_status=config['upload']['privacy_status'],
+                thumbnail_path=thumbnail_path,
+                caption_path=caption_path,
+                caption_language=caption_config.get('language', "en")
             )
             
+            video_id = uploads['youtube']
             if video_id:
                 logger.info(f"Successfully uploaded! URL: https://youtube.com/watch?v={video_id}")
-                # Backup to Drive
-                drive_link = drive_api.upload_file(final_video_path)
-                if drive_link:
-                    logger.info(f"Backup uploaded to Drive: {drive_link}")
             else:
                 logger.error("YouTube Upload failed.")
+            if uploads['drive']:
+                logger.info(f"Backup uploaded to Drive: {uploads['drive']}")
 
-            if not args.keep_temps and os.path.exists(final_video_path):
-                os.remove(final_video_path)
+            # Kept only while a saved session can resume the upload next run
+            if not args.keep_temps:
+                upload_stage.release_files(final_video_path, [thumbnail_path, preview_path, caption_path])
         else:
             logger.info("Dry run enabled. Skipping upload.")
 
@@ -207,6 +279,11 @@ def main():
     finally:
         if not args.keep_temps:
             cleanup(temp_files)
+        # Evicted only now, so no clip this run fetched is deleted before the render reads it
+        if clip_library.is_enabled():
+            clip_library.evict()
+        # The refill started after the render runs alongside the upload; let it finish
+        background_pool.wait()
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,7 @@
 import logging
 import os
-from googleapiclient.http import MediaFileUpload
 from src.utils import google_auth
+from src.upload import resumable_upload
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +30,12 @@ def get_folder_id(service, folder_name):
         logger.error(f"Error finding/creating folder: {e}")
         return None
 
-def upload_file(file_path, folder_name="ShortsAutomation_Uploads"):
+def upload_file(file_path, folder_name="ShortsAutomation_Uploads", creds=None):
     """
     Uploads a file to a specific Google Drive folder.
+    creds: already-loaded credentials (skips loading the token again).
     """
-    service = google_auth.get_service("drive", "v3")
+    service = google_auth.get_service("drive", "v3", creds=creds)
     if not service:
         logger.error("Failed to connect to Google Drive.")
         return None
@@ -50,10 +51,11 @@ def upload_file(file_path, folder_name="ShortsAutomation_Uploads"):
         if folder_id:
             file_metadata['parents'] = [folder_id]
 
-        media = MediaFileUpload(file_path, resumable=True)
+        media = resumable_upload.media(file_path)
 
         logger.info(f"Uploading to Drive folder '{folder_name}'...")
-        file = service.files().create(body=file_metadata, media_body=media, fields='id, webViewLink').execute()
+        request = service.files().create(body=file_metadata, media_body=media, fields='id, webViewLink')
+        file = resumable_upload.execute(request, file_path, "drive", label="Drive", metadata={"folder_name": folder_name})
         
         logger.info(f"✅ Drive Upload Complete! File ID: {file.get('id')}")
         return file.get('webViewLink')
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+logger = logging.getLogger(__name__)
+
+# Overridden from upload.resumable in settings.yaml via configure()
+DEFAULT_SETTINGS = {
+    "chunk_mb": 8,          # rounded to a multiple of 256 KiB, as the upload protocol requires
+    "retries": 6,           # consecutive failed attempts before giving up (the session is kept)
+    "backoff_seconds": 1,   # doubled after every failed attempt, capped at MAX_BACKOFF_SECONDS
+    "session_dir": "assets/cache/upload_sessions",
+}
+
+MAX_BACKOFF_SECONDS = 60
+CHUNK_GRANULARITY = 256 * 1024
+# A resumed session URI the server no longer knows (they expire after about a week)
+STALE_SESSION_STATUSES = (404, 410)
+
+_settings = dict(DEFAULT_SETTINGS)
+
+def configure(settings=None):
+    """Applies the upload.resumable settings section (missing keys keep their defaults)."""
+    global _settings
+    _settings = dict(DEFAULT_SETTINGS)
+    _settings.update({k: v for k, v in (settings or {}).items() if v is not None})
+    return _settings
+
+def chunk_size():
+    return max(1, round(float(_settings['chunk_mb']) * 1024 * 1024 / CHUNK_GRANULARITY)) * CHUNK_GRANULARITY
+
+def media(file_path, mimetype=None):
+    """Chunked resumable media body for file_path."""
+    return MediaFileUpload(file_path, mimetype=mimetype, chunksize=chunk_size(), resumable=True)
+
+def _file_identity(file_path):
+    st = os.stat(file_path)
+    return {"file": os.path.abspath(file_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _session_path(target, identity):
+    raw = f"{target}|{identity['file']}|{identity['size']}|{identity['mtime_ns']}"
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(_settings['session_dir'], f"{target}_{digest}.json")
+
+def _load_session(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable upload session {path}: {e}")
+        return None
+
+def _save_session(path, session):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(session, f)
+    os.replace(tmp_path, path)
+
+def _delete_session(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _is_retriable(error):
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500 or error.resp.status == 429
+    # Socket errors (resets, timeouts, SSL) are OSError subclasses
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+def execute(request, file_path, target, metadata=None, label=None):
+    """
+    Runs a resumable upload request chunk by chunk and returns the final response.
+    The session URI and committed offset are saved after every chunk, so a later
+    run uploading the same file to the same target continues where this one stopped.
+    5xx, 429 and socket errors are retried with exponential backoff; once the retries
+    are used up the error is raised and the session stays on disk. Any other error
+    drops the session before it is raised.
+    metadata is stored with the session so pending() can restart the upload.
+    """
+    label = label or target
+    identity = _file_identity(file_path)
+    session_path = _session_path(target, identity)
+    total = identity['size']
+
+    resumed = False
+    session = _load_session(session_path)
+    if session and session.get('resumable_uri'):
+        request.resumable_uri = session['resumable_uri']
+        request.resumable_progress = session.get('offset', 0)
+        # Makes next_chunk ask the server for the committed offset before sending data
+        request._in_error_state = True
+        resumed = True
+        logger.info(f"Resuming {label} upload of {file_path} at {request.resumable_progress / max(total, 1):.0%}")
+
+    def persist():
+        if request.resumable_uri:
+            _save_session(session_path, dict(
+                identity, target=target, resumable_uri=request.resumable_uri,
+                offset=request.resumable_progress, metadata=metadata or {}, updated=time.time()
+            ))
+
+    attempt = 0
+    response = None
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+        except Exception as e:
+            if resumed and isinstance(e, HttpError) and e.resp.status in STALE_SESSION_STATUSES:
+                logger.warning(f"Saved {label} upload session expired; starting the upload over.")
+                _delete_session(session_path)
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                request._in_error_state = False
+                resumed = False
+                continue
+            if not _is_retriable(e):
+                # 4xx (bad metadata, auth, quota): resuming the same request would fail again
+                _delete_session(session_path)
+                raise
+            persist()
+            attempt += 1
+            if attempt > _settings['retries']:
+                raise
+            delay = min(float(_settings['backoff_seconds']) * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+            logger.warning(f"{label} upload interrupted ({e}); retrying in {delay:.0f}s ({attempt}/{_settings['retries']})")
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # Interrupted (Ctrl+C, shutdown): keep what the server has committed
+            persist()
+            raise
+
+        attempt = 0
+        if response is None:
+            persist()
+        if status:
+            logger.info(f"{label} upload {int(status.progress() * 100)}%")
+
+    _delete_session(session_path)
+    return response
+
+def has_session(file_path):
+    """True if an unfinished upload session is saved for file_path (any target)."""
+    file_path = os.path.abspath(file_path)
+    return any(session['file'] == file_path for session in pending())
+
+def pending():
+    """
+    Saved sessions whose file still exists unchanged, as dicts with file, target,
+    offset, size and metadata. Sessions for deleted or modified files are removed.
+    """
+    session_dir = _settings['session_dir']
+    if not os.path.isdir(session_dir):
+        return []
+    sessions = []
+    for name in sorted(os.listdir(session_dir)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(session_dir, name)
+        session = _load_session(path)
+        try:
+            current = _file_identity(session['file']) if session else None
+        except (OSError, KeyError):
+            current = None
+        if not current or (current['size'], current['mtime_ns']) != (session.get('size'), session.get('mtime_ns')):
+            _delete_session(path)
+            continue
+        sessions.append(session)
+    return sessions
@@ -0,0 +1,111 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import google_auth
+from src.upload import youtube_api, drive_api, resumable_upload
+
+logger = logging.getLogger(__name__)
+
+def _youtube_job(creds, file_path, title, description, tags, privacy_status, thumbnail_path, caption_path, caption_language):
+    # One service per thread: the httplib2 transport under it is not thread-safe
+    youtube = youtube_api.get_authenticated_service(creds=creds)
+    if not youtube:
+        return None
+    # Saved with the upload session, so a resumed upload still sets these
+    session_metadata = {"thumbnail_path": thumbnail_path, "caption_path": caption_path, "caption_language": caption_language}
+    video_id = youtube_api.upload_video(
+        file_path, title, description, tags, privacy_status=privacy_status, youtube=youtube,
+        session_metadata=session_metadata
+    )
+    if not video_id:
+        return None
+    if thumbnail_path and os.path.exists(thumbnail_path):
+        youtube_api.set_thumbnail(video_id, thumbnail_path, youtube=youtube)
+    if caption_path and os.path.exists(caption_path):
+        youtube_api.upload_captions(video_id, caption_path, language=caption_language, youtube=youtube)
+    return video_id
+
+def upload(file_path, title, description, tags, privacy_status="private", thumbnail_path=None,
+           caption_path=None, caption_language="en", drive_folder="ShortsAutomation_Uploads", drive=True, youtube=True):
+    """
+    Uploads the rendered video to YouTube (plus thumbnail and captions) and, if drive
+    is set, backs it up to Drive at the same time. Credentials are loaded once and shared;
+    each upload builds its own service on its own thread and fails independently.
+    Returns {"youtube": video_id or None, "drive": webViewLink or None} for the targets uploaded to.
+    """
+    results = {name: None for name, wanted in (("youtube", youtube), ("drive", drive)) if wanted}
+    creds = google_auth.get_authenticated_creds()
+    if not creds:
+        logger.error("No Google credentials; skipping uploads.")
+        return results
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload") as pool:
+        jobs = {}
+        if youtube:
+            jobs["youtube"] = pool.submit(
+                _youtube_job, creds, file_path, title, description, tags, privacy_status,
+                thumbnail_path, caption_path, caption_language
+            )
+        if drive:
+            jobs["drive"] = pool.submit(drive_api.upload_file, file_path, drive_folder, creds=creds)
+
+        for name, job in jobs.items():
+            try:
+                results[name] = job.result()
+            except Exception as e:
+                logger.error(f"{name} upload failed: {e}")
+    return results
+
+def release_files(file_path, extra_files=()):
+    """
+    Deletes the uploaded video and its companion files (thumbnail, preview, captions)
+    unless a resumable session for it is saved, in which case they stay for the next
+    run to resume. A failed upload with no session has nothing to resume, so its
+    files are deleted too. Returns True if the files were released.
+    """
+    if resumable_upload.has_session(file_path):
+        logger.warning(f"Upload unfinished; keeping {file_path}, its thumbnail and captions for the next run to resume.")
+        return False
+    for path in [file_path, *extra_files]:
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+                logger.info(f"Deleted {path}")
+            except Exception as e:
+                logger.warning(f"Failed to delete {path}: {e}")
+    return True
+
+def resume_pending():
+    """
+    Finishes uploads an earlier run was interrupted in (saved resumable sessions whose
+    file is still there), with the metadata they were started with, including the
+    thumbnail and caption track once the video is up.
+    Returns {file_path: {"results", "thumbnail_path", "caption_path"}}.
+    """
+    by_file = {}
+    for session in resumable_upload.pending():
+        by_file.setdefault(session['file'], {})[session['target']] = session.get('metadata') or {}
+
+    finished = {}
+    for file_path, targets in by_file.items():
+        logger.info(f"Resuming interrupted upload(s) of {file_path}: {', '.join(sorted(targets))}")
+        video = targets.get('youtube') or {}
+        results = upload(
+            file_path,
+            video.get('title', os.path.basename(file_path)),
+            video.get('description', ""),
+            video.get('tags', []),
+            privacy_status=video.get('privacy_status', "private"),
+            thumbnail_path=video.get('thumbnail_path'),
+            caption_path=video.get('caption_path'),
+            caption_language=video.get('caption_language', "en"),
+            drive_folder=(targets.get('drive') or {}).get('folder_name', "ShortsAutomation_Uploads"),
+            youtube='youtube' in targets,
+            drive='drive' in targets
+        )
+        finished[file_path] = {
+            "results": results,
+            "thumbnail_path": video.get('thumbnail_path'),
+            "caption_path": video.get('caption_path'),
+        }
+    return finished
@@ -1,12 +1,14 @@
 import logging
 import os
 from src.utils import google_auth
+from src.upload import resumable_upload
 from googleapiclient.http import MediaFileUpload
 
 logger = logging.getLogger(__name__)
 
-def get_authenticated_service():
-    service = google_auth.get_service("youtube", "v3")
+def get_authenticated_service(creds=None):
+    """YouTube service; pass already-loaded creds to skip loading the token again."""
+    service = google_auth.get_service("youtube", "v3", creds=creds)
     if not service:
         return None
 
@@ -21,9 +23,15 @@ def get_authenticated_service():
 
     return service
 
-def upload_video(file_path, title, description, tags, privacy_status="private"):
+def upload_video(file_path, title, description, tags, privacy_status="private", youtube=None, session_metadata=None):
+    """
+    Chunked resumable upload; an interrupted upload of the same file (even from an
+    earlier run) continues from the last committed chunk.
+    session_metadata: extra keys saved with the session (e.g. the thumbnail and
+    caption paths to finish once a resumed upload completes).
+    """
     try:
-        youtube = get_authenticated_service()
+        youtube = youtube or get_authenticated_service()
         if not youtube:
             return None
 
@@ -40,7 +48,7 @@ def upload_video(file_path, title, description, tags, privacy_status="private"):
             }
         }
 
-        media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+        media = resumable_upload.media(file_path)
         
         logger.info(f"Uploading {file_path}...")
         request = youtube.videos().insert(
@@ -49,11 +57,13 @@ def upload_video(file_path, title, description, tags, privacy_status="private"):
             media_body=media
         )
         
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                logger.info(f"Uploaded {int(status.progress() * 100)}%")
+        response = resumable_upload.execute(
+            request, file_path, "youtube", label="YouTube",
+            metadata=dict(
+                session_metadata or {},
+                title=title, description=description, tags=tags, privacy_status=privacy_status
+            )
+        )
         
         logger.info(f"Upload Complete! Video ID: {response['id']}")
         return response['id']
@@ -61,3 +71,62 @@ def upload_video(file_path, title, description, tags, privacy_status="private"):
     except Exception as e:
         logger.error(f"An error occurred during upload: {e}")
         return None
+
+def upload_captions(video_id, caption_path, language="en", name="", youtube=None):
+    """
+    Uploads a sidecar caption track (SRT/VTT) to an existing video.
+    Requires the youtube.force-ssl scope; older tokens must be refreshed with reauthenticate.py.
+    """
+    if not caption_path or not os.path.exists(caption_path):
+        logger.error(f"Caption file not found: {caption_path}")
+        return None
+
+    try:
+        youtube = youtube or get_authenticated_service()
+        if not youtube:
+            return None
+
+        body = {
+            "snippet": {
+                "videoId": video_id,
+                "language": language,
+                "name": name,
+                "isDraft": False
+            }
+        }
+        media = MediaFileUpload(caption_path, mimetype="application/octet-stream", resumable=False)
+
+        logger.info(f"Uploading caption track {caption_path} ({language})...")
+        response = youtube.captions().insert(part="snippet", body=body, media_body=media).execute()
+        logger.info(f"Caption track uploaded. Caption ID: {response['id']}")
+        return response['id']
+
+    except Exception as e:
+        logger.error(f"Caption upload failed: {e}")
+        if "insufficient" in str(e).lower() or "403" in str(e):
+            logger.error("Token may lack the youtube.force-ssl scope. Run 'python src/utils/reauthenticate.py' to refresh it.")
+        return None
+
+def set_thumbnail(video_id, thumbnail_path, youtube=None):
+    """
+    Sets a custom thumbnail (JPEG, max 2 MB) on an uploaded video.
+    The channel must be verified for custom thumbnails.
+    """
+    if not thumbnail_path or not os.path.exists(thumbnail_path):
+        logger.error(f"Thumbnail file not found: {thumbnail_path}")
+        return None
+
+    try:
+        youtube = youtube or get_authenticated_service()
+        if not youtube:
+            return None
+
+        media = MediaFileUpload(thumbnail_path, mimetype="image/jpeg", resumable=False)
+        logger.info(f"Setting thumbnail {thumbnail_path}...")
+        response = youtube.thumbnails().set(videoId=video_id, media_body=media).execute()
+        logger.info("Thumbnail set.")
+        return response
+
+    except Exception as e:
+        logger.error(f"Thumbnail upload failed: {e}")
+        return None
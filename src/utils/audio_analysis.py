@@ -0,0 +1,135 @@
+import os
+import logging
+import subprocess
+import tempfile
+import numpy as np
+from src.utils import media_probe
+
+logger = logging.getLogger(__name__)
+
+# Analysis is done on a low-rate mono decode: plenty for loudness and silence detection
+ANALYSIS_SAMPLE_RATE = 16000
+FRAME_MS = 20
+# Frames quieter than this (dBFS) count as silence when trimming
+SILENCE_THRESHOLD_DB = -40.0
+# Frames processed per NumPy block (~60 s at 20 ms frames)
+FRAMES_PER_BLOCK = 3000
+
+# Results keyed by (abs path, size, mtime) so a rewritten file is re-analyzed
+_analysis_cache = {}
+
+def _cache_key(file_path):
+    st = os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+def _decode_to_pcm(file_path, pcm_path, sample_rate=ANALYSIS_SAMPLE_RATE):
+    """Decode any audio file to raw mono 16-bit little-endian PCM with ffmpeg."""
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-i", file_path,
+         "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", pcm_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True
+    )
+
+def measure_samples(samples, sample_rate=ANALYSIS_SAMPLE_RATE, silence_threshold_db=SILENCE_THRESHOLD_DB):
+    """
+    Single pass over int16 PCM samples (array or memmap).
+    Returns duration, overall RMS loudness (dBFS) and the silence-trimmed speech window.
+    """
+    total = len(samples)
+    duration = total / sample_rate
+    frame_len = max(1, int(sample_rate * FRAME_MS / 1000))
+    n_frames = total // frame_len
+
+    # Frame energy threshold in squared int16 units
+    threshold = (32768.0 * 10 ** (silence_threshold_db / 20)) ** 2
+    energy_sum = 0.0
+    first_loud = None
+    last_loud = None
+
+    for start in range(0, n_frames, FRAMES_PER_BLOCK):
+        stop = min(start + FRAMES_PER_BLOCK, n_frames)
+        block = np.asarray(samples[start * frame_len:stop * frame_len], dtype=np.float32)
+        block = block.reshape(-1, frame_len)
+        frame_energy = np.einsum('ij,ij->i', block, block, dtype=np.float64) / frame_len
+        energy_sum += frame_energy.sum() * frame_len
+
+        loud = np.flatnonzero(frame_energy > threshold)
+        if loud.size:
+            if first_loud is None:
+                first_loud = start + loud[0]
+            last_loud = start + loud[-1]
+
+    # Tail samples that don't fill a whole frame still count towards loudness
+    tail = np.asarray(samples[n_frames * frame_len:], dtype=np.float64)
+    energy_sum += float(np.dot(tail, tail))
+
+    if total:
+        mean_square = energy_sum / total
+        rms_db = 10 * np.log10(mean_square) - 20 * np.log10(32768.0) if mean_square > 0 else float('-inf')
+    else:
+        rms_db = float('-inf')
+
+    if first_loud is None:
+        speech_start, speech_end = 0.0, duration
+    else:
+        speech_start = int(first_loud) * frame_len / sample_rate
+        speech_end = min((int(last_loud) + 1) * frame_len / sample_rate, duration)
+
+    return {
+        "duration": duration,
+        "rms_db": float(rms_db),
+        "speech_start": speech_start,
+        "speech_end": speech_end,
+    }
+
+def _fallback_analysis(file_path):
+    """Duration-only analysis when ffmpeg can't decode the file."""
+    duration = media_probe.get_duration(file_path)
+    if duration is None:
+        from mutagen import File as MutagenFile
+        duration = MutagenFile(file_path).info.length
+    return {
+        "duration": duration,
+        "rms_db": None,
+        "speech_start": 0.0,
+        "speech_end": duration,
+    }
+
+def analyze_audio(file_path, silence_threshold_db=SILENCE_THRESHOLD_DB):
+    """
+    Decodes the file once to a memory-mapped PCM temp file and measures it with NumPy.
+    Returns dict: duration, rms_db, speech_start, speech_end (seconds). Cached per file.
+    """
+    key = _cache_key(file_path) + (silence_threshold_db,)
+    if key in _analysis_cache:
+        return _analysis_cache[key]
+
+    fd, pcm_path = tempfile.mkstemp(suffix=".pcm")
+    os.close(fd)
+    try:
+        _decode_to_pcm(file_path, pcm_path)
+        if os.path.getsize(pcm_path) >= 2:
+            samples = np.memmap(pcm_path, dtype='<i2', mode='r')
+            result = measure_samples(samples, silence_threshold_db=silence_threshold_db)
+            # Release the mapping before deleting the file (required on Windows)
+            del samples
+        else:
+            result = measure_samples(np.zeros(0, dtype=np.int16))
+    except Exception as e:
+        logger.warning(f"PCM analysis failed for {file_path}, using duration only: {e}")
+        result = _fallback_analysis(file_path)
+    finally:
+        try:
+            os.remove(pcm_path)
+        except OSError:
+            pass
+
+    logger.info(
+        f"Audio analysis {os.path.basename(file_path)}: {result['duration']:.2f}s, "
+        f"speech {result['speech_start']:.2f}-{result['speech_end']:.2f}s"
+    )
+    _analysis_cache[key] = result
+    return result
+
+def get_audio_duration(file_path):
+    return analyze_audio(file_path)["duration"]
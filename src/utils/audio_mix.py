@@ -0,0 +1,116 @@
+import os
+import random
+import hashlib
+import logging
+import ffmpeg
+from src.utils import audio_analysis, ffmpeg_runner
+
+logger = logging.getLogger(__name__)
+
+MUSIC_CACHE_DIR = "assets/cache/music"
+CACHE_VERSION = 1
+# Everything is mixed (and cached) at the output rate, so the final mux never resamples
+MIX_SAMPLE_RATE = 48000
+MIX_CHANNELS = 2
+# Music tracks are leveled to this RMS before the per-format volume is applied
+MUSIC_TARGET_RMS_DB = -20.0
+MAX_MUSIC_GAIN_DB = 12.0
+
+# Voice-keyed compressor on the music (sidechaincompress)
+DUCKING_SETTINGS = {
+    "threshold": 0.05,
+    "ratio": 8,
+    "attack": 20,
+    "release": 400,
+}
+
+def pick_music(music_dir):
+    """Random .mp3/.ogg from music_dir, or None."""
+    music_files = [f for f in os.listdir(music_dir) if f.endswith('.mp3') or f.endswith('.ogg')] if os.path.isdir(music_dir) else []
+    if not music_files:
+        return None
+    return os.path.join(music_dir, random.choice(music_files))
+
+def _music_cache_path(music_path, cache_dir, sample_rate):
+    st = os.stat(music_path)
+    raw = f"{CACHE_VERSION}|{os.path.abspath(music_path)}|{st.st_size}|{st.st_mtime_ns}|{sample_rate}|{MUSIC_TARGET_RMS_DB}"
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(music_path))[0].replace(' ', '_')
+    return os.path.join(cache_dir, f"{stem}_{digest}.wav")
+
+def get_leveled_music(music_path, cache_dir=MUSIC_CACHE_DIR, sample_rate=MIX_SAMPLE_RATE):
+    """
+    Decodes a music track once to PCM WAV at the mix rate, leveled to MUSIC_TARGET_RMS_DB.
+    Cached per (file, size, mtime); later renders just read the WAV.
+    Returns the cached path or None on failure.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = _music_cache_path(music_path, cache_dir, sample_rate)
+        if os.path.exists(cache_path):
+            return cache_path
+
+        rms_db = audio_analysis.analyze_audio(music_path).get('rms_db')
+        gain_db = 0.0
+        if rms_db is not None and rms_db != float('-inf'):
+            gain_db = min(MUSIC_TARGET_RMS_DB - rms_db, MAX_MUSIC_GAIN_DB)
+
+        stream = ffmpeg.input(music_path).audio.filter('volume', f"{gain_db:.2f}dB")
+        if gain_db > 0:
+            # Boosted quiet tracks must not clip
+            stream = stream.filter('alimiter', limit=0.95)
+
+        tmp_path = f"{cache_path}.tmp.wav"
+        out = ffmpeg.output(stream, tmp_path, acodec='pcm_s16le', ar=sample_rate, ac=MIX_CHANNELS)
+        ffmpeg_runner.run(out, label="music cache")
+        os.replace(tmp_path, cache_path)
+        logger.info(f"Cached leveled music ({gain_db:+.1f} dB): {cache_path}")
+        return cache_path
+    except Exception as e:
+        logger.error(f"Failed to prepare music track {music_path}: {e}")
+        if hasattr(e, 'stderr') and e.stderr:
+            logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8')}")
+        return None
+
+def build_audio_bed(voice_path, duration, output_path, music_dir="assets/music", music_volume=0.1, ducking=False, cache_dir=MUSIC_CACHE_DIR):
+    """
+    Mixes voice + looping background music into one AAC file of exactly `duration` seconds,
+    before any video is encoded. The composers then mux it with a stream copy.
+    ducking: lower the music under the voice with sidechaincompress.
+    Returns output_path or None on failure.
+    """
+    try:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        voice = (
+            ffmpeg.input(voice_path).audio
+            .filter('aresample', MIX_SAMPLE_RATE)
+            .filter('aformat', channel_layouts='stereo')
+        )
+
+        music_path = pick_music(music_dir)
+        leveled_path = get_leveled_music(music_path, cache_dir) if music_path else None
+        if leveled_path:
+            music = (
+                ffmpeg.input(leveled_path, stream_loop=-1).audio
+                .filter('volume', music_volume)
+                .filter('atrim', duration=duration)
+            )
+            if ducking:
+                split = voice.filter_multi_output('asplit', 2)
+                voice, sidechain = split[0], split[1]
+                music = ffmpeg.filter([music, sidechain], 'sidechaincompress', **DUCKING_SETTINGS)
+            mixed = ffmpeg.filter([voice, music], 'amix', inputs=2, duration='longest')
+        else:
+            logger.warning(f"No music found in {music_dir}. Proceeding without background music.")
+            mixed = voice
+
+        # Pad/cut to the exact video length
+        mixed = mixed.filter('apad', whole_dur=duration).filter('atrim', duration=duration)
+        out = ffmpeg.output(mixed, output_path, acodec='aac', ar=MIX_SAMPLE_RATE)
+        ffmpeg_runner.run(out, label="audio bed", expected_duration=duration)
+        return output_path
+    except Exception as e:
+        logger.error(f"Failed to build audio bed: {e}")
+        if hasattr(e, 'stderr') and e.stderr:
+            logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8')}")
+        return None
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Overridden from the `background_library` section of settings.yaml via configure()
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "dir": "assets/cache/backgrounds",
+    "search_ttl_hours": 24,  # Pexels search responses are reused this long
+    "max_gb": 5,             # least recently used clips are evicted above this
+}
+
+INDEX_FILE = "library.json"
+CACHE_VERSION = 1
+
+_settings = dict(DEFAULT_SETTINGS)
+_lock = threading.Lock()
+_index = None
+
+def configure(settings=None):
+    """Applies the `background_library` settings section (missing keys keep their defaults)."""
+    global _settings, _index
+    _settings = dict(DEFAULT_SETTINGS)
+    _settings.update({k: v for k, v in (settings or {}).items() if v is not None})
+    _index = None
+    return _settings
+
+def is_enabled():
+    return bool(_settings['enabled'])
+
+def _index_path():
+    return os.path.join(_settings['dir'], INDEX_FILE)
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return _index
+    _index = {"searches": {}, "clips": {}}
+    try:
+        with open(_index_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            _index = {"searches": data.get('searches', {}), "clips": data.get('clips', {})}
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable clip library index: {e}")
+
+    # Reconcile with the disk: drop entries whose file is gone, adopt untracked clips
+    clips = _index['clips']
+    for name in list(clips):
+        if not os.path.exists(os.path.join(_settings['dir'], name)):
+            del clips[name]
+    if os.path.isdir(_settings['dir']):
+        for name in os.listdir(_settings['dir']):
+            path = os.path.join(_settings['dir'], name)
+            if name.endswith('.mp4') and name not in clips:
+                clips[name] = {"size": os.path.getsize(path), "last_used": os.path.getmtime(path)}
+    return _index
+
+def _save_index():
+    index = _load_index()
+    ttl = _settings['search_ttl_hours'] * 3600
+    now = time.time()
+    # Stale searches are kept a while longer as an offline fallback
+    index['searches'] = {k: v for k, v in index['searches'].items() if now - v['fetched_at'] < ttl * 7}
+    os.makedirs(_settings['dir'], exist_ok=True)
+    tmp_path = f"{_index_path()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, **index}, f)
+    os.replace(tmp_path, _index_path())
+
+def _search_key(query, orientation, per_page, page):
+    return f"{query.strip().lower()}|{orientation}|{per_page}|{page}"
+
+def get_search(query, orientation, per_page, page=1, allow_stale=False):
+    """Cached Pexels search response, or None if missing or older than the TTL (unless allow_stale)."""
+    if not is_enabled():
+        return None
+    with _lock:
+        entry = _load_index()['searches'].get(_search_key(query, orientation, per_page, page))
+    if not entry:
+        return None
+    if not allow_stale and time.time() - entry['fetched_at'] > _settings['search_ttl_hours'] * 3600:
+        return None
+    return entry['data']
+
+def put_search(query, orientation, per_page, page, data):
+    if not is_enabled():
+        return
+    with _lock:
+        _load_index()['searches'][_search_key(query, orientation, per_page, page)] = {"fetched_at": time.time(), "data": data}
+        try:
+            _save_index()
+        except Exception as e:
+            logger.warning(f"Could not write clip library index: {e}")
+
+def rendition_key(rendition):
+    """Names one Pexels rendition (a video_files entry) in file names: its file id, else WxH."""
+    return rendition.get('id') or f"{rendition.get('width')}x{rendition.get('height')}"
+
+def clip_path(video_id, rendition):
+    """Library location for one rendition of a Pexels video (rendition: the video_files entry)."""
+    return os.path.join(_settings['dir'], f"pexels_{video_id}_{rendition_key(rendition)}.mp4")
+
+def owns(path):
+    """True for clips kept in the library (callers must not delete these)."""
+    if not path or not is_enabled():
+        return False
+    library_dir = os.path.abspath(_settings['dir'])
+    return os.path.dirname(os.path.abspath(path)) == library_dir
+
+def lookup_clip(path):
+    """Marks a library clip as used. Returns False if it isn't on disk."""
+    if not os.path.exists(path):
+        return False
+    with _lock:
+        clips = _load_index()['clips']
+        clips[os.path.basename(path)] = {"size": os.path.getsize(path), "last_used": time.time()}
+        try:
+            _save_index()
+        except Exception as e:
+            logger.warning(f"Could not write clip library index: {e}")
+    return True
+
+def add_clip(path):
+    """
+    Registers a newly downloaded clip. Nothing is evicted here: a run may still need
+    clips it fetched earlier, so the pipeline calls evict() once the run is done.
+    """
+    lookup_clip(path)
+
+def evict(max_bytes=None, keep=()):
+    """Deletes least recently used clips until the library fits in max_bytes (default: max_gb)."""
+    if max_bytes is None:
+        max_bytes = int(_settings['max_gb'] * 1024 ** 3)
+    removed = []
+    with _lock:
+        clips = _load_index()['clips']
+        total = sum(entry['size'] for entry in clips.values())
+        for name, entry in sorted(clips.items(), key=lambda item: item[1]['last_used']):
+            if total <= max_bytes:
+                break
+            if name in keep:
+                continue
+            try:
+                os.remove(os.path.join(_settings['dir'], name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict {name}: {e}")
+                continue
+            total -= entry['size']
+            del clips[name]
+            removed.append(name)
+        if removed:
+            _save_index()
+    if removed:
+        logger.info(f"Clip library: evicted {len(removed)} clip(s), {total / 1024 ** 2:.0f} MB kept.")
+    return removed
@@ -0,0 +1,169 @@
+import time
+import logging
+import threading
+import subprocess
+import collections
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Overridden from the `ffmpeg` section of settings.yaml via configure()
+DEFAULT_SETTINGS = {
+    "stall_seconds": 90,         # kill if the output timestamp doesn't advance for this long
+    "deadline_seconds": 3600,    # hard limit per ffmpeg run
+    "progress_log_seconds": 15,  # how often progress is logged
+}
+
+# Only the tail of stderr is kept for error reports
+STDERR_TAIL_LINES = 200
+
+_settings = dict(DEFAULT_SETTINGS)
+
+def configure(settings=None):
+    """Applies the `ffmpeg` settings section (missing keys keep their defaults)."""
+    global _settings
+    _settings = dict(DEFAULT_SETTINGS)
+    _settings.update({k: v for k, v in (settings or {}).items() if v is not None})
+    return _settings
+
+class FFmpegRunError(Exception):
+    """ffmpeg failed, stalled or hit its deadline. `result` is the structured run report."""
+    def __init__(self, result):
+        self.result = result
+        # Same attribute as ffmpeg.Error so the composers' error logging keeps working
+        self.stderr = result.get('stderr', '').encode('utf-8')
+        super().__init__(f"ffmpeg {result['label']} {result['status']}: {result['reason']}")
+
+def _parse_speed(value):
+    try:
+        return float(value.rstrip('x'))
+    except (AttributeError, ValueError):
+        return None
+
+def _read_progress(pipe, state, lock):
+    """Parses `-progress` key=value blocks; each block ends with progress=continue|end."""
+    block = {}
+    for raw in iter(pipe.readline, b''):
+        line = raw.decode('utf-8', 'replace').strip()
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        block[key] = value
+        if key != 'progress':
+            continue
+        out_time_us = block.get('out_time_us') or block.get('out_time_ms')
+        with lock:
+            try:
+                out_time = max(0.0, int(out_time_us) / 1_000_000)
+            except (TypeError, ValueError):
+                out_time = state['out_time']
+            if out_time > state['out_time']:
+                state['out_time'] = out_time
+                state['last_advance'] = time.monotonic()
+            try:
+                state['frame'] = int(block.get('frame', state['frame']))
+                state['fps'] = float(block.get('fps', state['fps']))
+            except ValueError:
+                pass
+            state['speed'] = _parse_speed(block.get('speed'))
+            state['done'] = value == 'end'
+        block = {}
+
+def _read_stderr(pipe, tail):
+    for raw in iter(pipe.readline, b''):
+        tail.append(raw.decode('utf-8', 'replace').rstrip())
+
+def _eta(state, expected_duration, elapsed):
+    if not expected_duration or state['out_time'] <= 0:
+        return None
+    rate = state['out_time'] / elapsed
+    return max(0.0, (expected_duration - state['out_time']) / rate) if rate > 0 else None
+
+def run(stream_spec, label="encode", expected_duration=None):
+    """
+    Runs an ffmpeg-python graph with `-progress pipe:1` and a watchdog.
+    Logs frame/fps/speed/out_time/ETA every progress_log_seconds.
+    The process is killed if out_time stops advancing for stall_seconds or the
+    run exceeds deadline_seconds.
+    Returns dict: label, status ('ok'), reason, returncode, elapsed, out_time, frame, fps, speed.
+    Raises FFmpegRunError (with the same dict plus the stderr tail) otherwise.
+    """
+    settings = _settings
+    args = ffmpeg.compile(stream_spec, overwrite_output=True)
+    # ffmpeg-python puts the executable first; progress goes to stdout, stats off
+    args = [args[0], '-hide_banner', '-nostdin', '-progress', 'pipe:1', '-nostats'] + args[1:]
+
+    start = time.monotonic()
+    state = {"out_time": 0.0, "frame": 0, "fps": 0.0, "speed": None, "done": False, "last_advance": start}
+    lock = threading.Lock()
+    stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+
+    process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    readers = [
+        threading.Thread(target=_read_progress, args=(process.stdout, state, lock), daemon=True),
+        threading.Thread(target=_read_stderr, args=(process.stderr, stderr_tail), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    status, reason = "ok", "completed"
+    last_log = start
+    while True:
+        try:
+            process.wait(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        now = time.monotonic()
+        elapsed = now - start
+        with lock:
+            snapshot = dict(state)
+
+        if elapsed > settings['deadline_seconds']:
+            status, reason = "timeout", f"exceeded deadline of {settings['deadline_seconds']}s"
+        elif now - snapshot['last_advance'] > settings['stall_seconds']:
+            status, reason = "stalled", f"no progress for {settings['stall_seconds']}s at out_time {snapshot['out_time']:.1f}s"
+        if status != "ok":
+            logger.error(f"FFmpeg {label} {status}: {reason}. Killing process.")
+            process.kill()
+            break
+
+        if now - last_log >= settings['progress_log_seconds']:
+            last_log = now
+            progress = _progress_report(label, snapshot, expected_duration, elapsed)
+            logger.info(
+                f"FFmpeg {label}: {progress['out_time']:.1f}s"
+                + (f"/{expected_duration:.1f}s" if expected_duration else "")
+                + f" frame={progress['frame']} fps={progress['fps']:.1f}"
+                + (f" speed={progress['speed']:.2f}x" if progress['speed'] is not None else "")
+                + (f" ETA {progress['eta']:.0f}s" if progress['eta'] is not None else "")
+            )
+
+    returncode = process.wait()
+    for reader in readers:
+        reader.join(timeout=5)
+
+    elapsed = time.monotonic() - start
+    result = _progress_report(label, state, expected_duration, elapsed)
+    result.update({"status": status, "reason": reason, "returncode": returncode})
+    if status == "ok" and returncode != 0:
+        result.update({"status": "failed", "reason": f"exit code {returncode}"})
+
+    if result['status'] != "ok":
+        result['stderr'] = "\n".join(stderr_tail)
+        raise FFmpegRunError(result)
+
+    realtime = f", {result['out_time'] / elapsed:.2f}x realtime" if elapsed > 0 else ""
+    logger.info(f"FFmpeg {label} finished in {elapsed:.1f}s ({result['out_time']:.1f}s of media{realtime})")
+    return result
+
+def _progress_report(label, state, expected_duration, elapsed):
+    return {
+        "label": label,
+        "elapsed": elapsed,
+        "out_time": state['out_time'],
+        "frame": state['frame'],
+        "fps": state['fps'],
+        "speed": state['speed'],
+        "eta": _eta(state, expected_duration, elapsed) if elapsed > 0 else None,
+    }
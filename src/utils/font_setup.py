@@ -0,0 +1,159 @@
+import os
+import shutil
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+FONTS_DIR = "assets/fonts"
+FONTCONFIG_CACHE_DIR = "assets/cache/fontconfig"
+
+# Copied into the fonts dir on first run. Liberation Sans is metric-compatible with
+# Arial (the ASS style font), so it goes first; CI installs it via fonts-liberation.
+SYSTEM_FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation2/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+    "C:/Windows/Fonts/arialbd.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+
+FONT_EXTENSIONS = ('.ttf', '.otf')
+
+# The face used for drawtext, the quote card and the ASS aliases, picked by file name
+# (in this order) from the bundled dir, whatever else has been copied in there
+PREFERRED_FONT_FILES = [os.path.basename(path) for path in SYSTEM_FONT_CANDIDATES]
+
+# Included after the bundled dir so glyphs the bundled font lacks (non-Latin text,
+# symbols, emoji) fall back to system fonts instead of rendering as tofu
+SYSTEM_FONTS_CONF = "/etc/fonts/fonts.conf"
+
+# Families the ASS styles and drawtext ask for; all are mapped to the bundled font
+REQUESTED_FAMILIES = ["Arial", "Sans", "sans-serif", "Helvetica"]
+
+FONTS_CONF_TEMPLATE = """<?xml version="1.0"?>
+<!DOCTYPE fontconfig SYSTEM "fonts.dtd">
+<fontconfig>
+  <dir>{fonts_dir}</dir>
+  <cachedir>{cache_dir}</cachedir>
+{aliases}
+  <include ignore_missing="yes">{system_conf}</include>
+</fontconfig>
+"""
+
+def _list_fonts(fonts_dir):
+    if not os.path.isdir(fonts_dir):
+        return []
+    return sorted(os.path.join(fonts_dir, f) for f in os.listdir(fonts_dir) if f.lower().endswith(FONT_EXTENSIONS))
+
+def ensure_font_assets(fonts_dir=FONTS_DIR):
+    """Makes sure the bundled fonts dir has at least one font, copying one from the system if needed."""
+    os.makedirs(fonts_dir, exist_ok=True)
+    fonts = _list_fonts(fonts_dir)
+    if fonts:
+        return fonts
+
+    for candidate in SYSTEM_FONT_CANDIDATES:
+        if os.path.exists(candidate):
+            target = os.path.join(fonts_dir, os.path.basename(candidate))
+            shutil.copyfile(candidate, target)
+            logger.info(f"Bundled font {candidate} into {fonts_dir}")
+            return [target]
+
+    logger.warning(f"No font found to bundle into {fonts_dir}. libass/drawtext will use system fonts.")
+    return []
+
+def pick_font_file(fonts):
+    """The preferred face among fonts (by file name), else the first one."""
+    by_name = {os.path.basename(path).lower(): path for path in fonts}
+    for name in PREFERRED_FONT_FILES:
+        if name.lower() in by_name:
+            return by_name[name.lower()]
+    return fonts[0] if fonts else None
+
+def _font_family(font_file):
+    try:
+        from PIL import ImageFont
+        return ImageFont.truetype(font_file, 10).getname()[0]
+    except Exception:
+        return None
+
+def write_fonts_conf(fonts_dir, cache_dir, family):
+    """
+    Writes a fontconfig config that puts the bundled fonts dir first (the requested
+    families alias to it), falls back to the system config for missing glyphs, and
+    keeps its cache in a persistent location so startup stays warm.
+    The aliases come before the include so they win over the system's own Arial aliases.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    aliases = ""
+    if family:
+        aliases = "\n".join(
+            f'  <alias binding="same"><family>{name}</family><prefer><family>{family}</family></prefer></alias>'
+            for name in REQUESTED_FAMILIES
+        )
+    conf_path = os.path.join(cache_dir, "fonts.conf")
+    content = FONTS_CONF_TEMPLATE.format(
+        fonts_dir=os.path.abspath(fonts_dir),
+        cache_dir=os.path.abspath(cache_dir),
+        aliases=aliases,
+        system_conf=SYSTEM_FONTS_CONF
+    )
+    # Only rewrite when it changes, so the cache stays valid
+    existing = None
+    if os.path.exists(conf_path):
+        with open(conf_path, 'r', encoding='utf-8') as f:
+            existing = f.read()
+    if existing != content:
+        with open(conf_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return conf_path
+
+def warm_font_cache(conf_path):
+    """Pre-builds the fontconfig cache with fc-cache (if available) into the persistent cache dir."""
+    if not shutil.which("fc-cache"):
+        logger.debug("fc-cache not available; fontconfig will build its cache on first use.")
+        return False
+    env = dict(os.environ, FONTCONFIG_FILE=os.path.abspath(conf_path))
+    try:
+        subprocess.run(["fc-cache"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=120)
+        return True
+    except Exception as e:
+        logger.warning(f"fc-cache warm-up failed: {e}")
+        return False
+
+_font_setup = None
+
+def get_font_setup(fonts_dir=FONTS_DIR, cache_dir=FONTCONFIG_CACHE_DIR):
+    """
+    Resolves fonts once per process.
+    Returns dict: fonts_dir, font_file (for drawtext/Pillow), family.
+    Also points FONTCONFIG_FILE at the bundled config so every ffmpeg child
+    process inherits the warm cache instead of scanning system fonts.
+    """
+    global _font_setup
+    if _font_setup is not None:
+        return _font_setup
+
+    fonts = ensure_font_assets(fonts_dir)
+    font_file = pick_font_file(fonts)
+    family = _font_family(font_file) if font_file else None
+
+    if font_file:
+        conf_path = write_fonts_conf(fonts_dir, cache_dir, family)
+        os.environ["FONTCONFIG_FILE"] = os.path.abspath(conf_path)
+        warm_font_cache(conf_path)
+        logger.info(f"Fonts resolved: {font_file} ({family}), fontconfig cache in {cache_dir}")
+
+    _font_setup = {
+        "fonts_dir": os.path.abspath(fonts_dir) if font_file else None,
+        "font_file": font_file,
+        "family": family,
+    }
+    return _font_setup
+
+def ffmpeg_filter_path(path):
+    """Escapes a path for use as an ffmpeg filter option value."""
+    return path.replace('\\', '/').replace(':', '\\:')
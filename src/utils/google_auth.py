@@ -10,6 +10,8 @@ logger = logging.getLogger(__name__)
 # Combined scopes for YouTube and Drive
 SCOPES = [
     "https://www.googleapis.com/auth/youtube.upload",
+    # Needed for captions.insert (sidecar caption tracks)
+    "https://www.googleapis.com/auth/youtube.force-ssl",
     "https://www.googleapis.com/auth/drive.file"
 ]
 
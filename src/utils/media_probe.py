@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import logging
+import threading
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_PATH = "assets/cache/media_probe.json"
+CACHE_VERSION = 1
+# Oldest entries are dropped past this many files
+MAX_CACHE_ENTRIES = 1000
+
+_lock = threading.Lock()
+_cache = None
+_cache_path = None
+_default_cache_path = PROBE_CACHE_PATH
+
+def configure(cache_path=None):
+    """Sets the cache file probe() uses when no cache_path is given (None restores the default)."""
+    global _default_cache_path, _cache, _cache_path
+    with _lock:
+        _default_cache_path = cache_path or PROBE_CACHE_PATH
+        _cache, _cache_path = None, None
+    return _default_cache_path
+
+def _parse_rate(rate):
+    """ffprobe rates are fractions like '30000/1001'."""
+    try:
+        num, _, den = str(rate).partition('/')
+        value = float(num) / float(den or 1)
+        return value if value > 0 else None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def summarize_probe(probe):
+    """Reduces raw ffprobe JSON to the fields the pipeline uses."""
+    fmt = probe.get('format', {})
+    streams = probe.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video' and not s.get('disposition', {}).get('attached_pic')), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+    info = {
+        "duration": _to_float(fmt.get('duration')),
+        "format_name": fmt.get('format_name'),
+        "bit_rate": _to_int(fmt.get('bit_rate')),
+        "video": None,
+        "audio": None,
+    }
+    if video:
+        info["video"] = {
+            "codec": video.get('codec_name'),
+            "width": _to_int(video.get('width')),
+            "height": _to_int(video.get('height')),
+            "fps": _parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate')),
+            "pix_fmt": video.get('pix_fmt'),
+            "nb_frames": _to_int(video.get('nb_frames')),
+            "duration": _to_float(video.get('duration')),
+        }
+    if audio:
+        info["audio"] = {
+            "codec": audio.get('codec_name'),
+            "sample_rate": _to_int(audio.get('sample_rate')),
+            "channels": _to_int(audio.get('channels')),
+            "duration": _to_float(audio.get('duration')),
+        }
+    if info["duration"] is None:
+        # Some containers only report per-stream durations
+        stream_durations = [s["duration"] for s in (info["video"], info["audio"]) if s and s["duration"]]
+        info["duration"] = max(stream_durations) if stream_durations else None
+    return info
+
+def _load_cache(cache_path):
+    global _cache, _cache_path
+    if _cache is not None and _cache_path == cache_path:
+        return _cache
+    _cache, _cache_path = {}, cache_path
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            _cache = data.get('entries', {})
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable probe cache {cache_path}: {e}")
+    return _cache
+
+def _save_cache(cache_path, entries):
+    if len(entries) > MAX_CACHE_ENTRIES:
+        # Keep the most recently probed files
+        newest = sorted(entries.items(), key=lambda item: item[1].get('probed_at', 0), reverse=True)
+        entries.clear()
+        entries.update(newest[:MAX_CACHE_ENTRIES])
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+    os.replace(tmp_path, cache_path)
+
+def probe(path, cache_path=None):
+    """
+    All stream metadata for a media file from a single ffprobe call.
+    Cached in memory and on disk (cache_path, else the configure()d file) keyed on
+    (abs path, size, mtime), so each asset is probed once for as long as it exists unchanged.
+    Returns dict: duration, format_name, bit_rate,
+    video (codec, width, height, fps, pix_fmt, nb_frames, duration) or None,
+    audio (codec, sample_rate, channels, duration) or None.
+    Returns None if the file can't be probed.
+    """
+    cache_path = cache_path or _default_cache_path
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        logger.warning(f"Cannot probe {path}: {e}")
+        return None
+
+    key = os.path.abspath(path)
+    with _lock:
+        entries = _load_cache(cache_path)
+        entry = entries.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['info']
+
+    try:
+        info = summarize_probe(ffmpeg.probe(path))
+    except Exception as e:
+        stderr = getattr(e, 'stderr', None)
+        logger.warning(f"ffprobe failed for {path}: {stderr.decode('utf-8', 'replace').strip() if stderr else e}")
+        return None
+
+    with _lock:
+        entries = _load_cache(cache_path)
+        entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "probed_at": time.time(), "info": info}
+        try:
+            _save_cache(cache_path, entries)
+        except Exception as e:
+            logger.warning(f"Could not write probe cache {cache_path}: {e}")
+    return info
+
+def get_duration(path):
+    """Container duration in seconds, or None."""
+    info = probe(path)
+    return info['duration'] if info else None
+
+def is_valid_video(path, min_duration=0.5):
+    """True if the file has a decodable-looking video stream and a real duration."""
+    info = probe(path)
+    if not info or not info['video'] or not info['video']['width']:
+        return False
+    return (info['duration'] or 0) >= min_duration
@@ -10,6 +10,7 @@ logger = logging.getLogger(__name__)
 # Combined scopes for YouTube and Drive
 SCOPES = [
     "https://www.googleapis.com/auth/youtube.upload",
+    "https://www.googleapis.com/auth/youtube.force-ssl",
     "https://www.googleapis.com/auth/drive.file"
 ]
 
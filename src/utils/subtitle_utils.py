@@ -4,21 +4,116 @@ import re
 
 logger = logging.getLogger(__name__)
 
-def format_ass_timestamp(seconds):
-    """Convert seconds to ASS timestamp format H:MM:SS.cc"""
-    if seconds < 0:
-        seconds = 0
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    centiseconds = int((secs - int(secs)) * 100)
-    return f"{hours}:{minutes:02d}:{int(secs):02d}.{centiseconds:02d}"
+def format_ass_timestamp_ms(ms):
+    """Convert integer milliseconds to ASS timestamp format H:MM:SS.cc (integer math only)."""
+    if ms < 0:
+        ms = 0
+    cs = ms // 10
+    hours, cs = divmod(cs, 360000)
+    minutes, cs = divmod(cs, 6000)
+    secs, cs = divmod(cs, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+
+def _ns_to_ms(ns):
+    return int(ns) // 10**6
+
+def _karaoke_text(lines):
+    """Render grouped word lines as \\k-tagged ASS text."""
+    ass_text_parts = []
+    for line in lines:
+        line_parts = []
+        for b in line:
+            dur_ms = _ns_to_ms(b['duration'])
+            k_dur = dur_ms // 10
+            line_parts.append(f"{{\\k{k_dur}}}{b['text']}")
+        ass_text_parts.append(" ".join(line_parts))
+    return "\\N".join(ass_text_parts)
+
+def _iter_segments(word_boundaries, max_chars_per_segment=50):
+    """Lazily groups a stream of word boundaries into ~2-line segments."""
+    current_segment = []
+    current_chars = 0
+    for boundary in word_boundaries:
+        word = boundary['text']
+        if current_chars + len(word) > max_chars_per_segment and current_segment:
+            yield current_segment
+            current_segment = []
+            current_chars = 0
+        current_segment.append(boundary)
+        current_chars += len(word) + 1
+    if current_segment:
+        yield current_segment
+
+def _split_segment_lines(segment, max_line_chars=25):
+    seg_lines = []
+    curr_line = []
+    curr_line_chars = 0
+    for b in segment:
+        if curr_line_chars + len(b['text']) > max_line_chars and curr_line:
+            seg_lines.append(curr_line)
+            curr_line = []
+            curr_line_chars = 0
+        curr_line.append(b)
+        curr_line_chars += len(b['text']) + 1
+    if curr_line:
+        seg_lines.append(curr_line)
+    return seg_lines
+
+def _split_quote_lines(word_boundaries, max_chars_per_line=25):
+    lines = []
+    current_line_words = []
+    current_line_length = 0
+    for boundary in word_boundaries:
+        word_len = len(boundary['text'].strip())
+        if current_line_length + word_len + (1 if current_line_words else 0) > max_chars_per_line and current_line_words:
+            lines.append(current_line_words)
+            current_line_words = []
+            current_line_length = 0
+        current_line_words.append(boundary)
+        current_line_length += word_len + 1
+    if current_line_words:
+        lines.append(current_line_words)
+    return lines
+
+def _dialogue(start_ms, end_ms, text):
+    return f"Dialogue: 0,{format_ass_timestamp_ms(start_ms)},{format_ass_timestamp_ms(end_ms)},Default,,0,0,0,,{text}"
+
+def iter_karaoke_events(word_boundaries, video_duration=None):
+    """
+    Generator of ASS Dialogue lines for a stream of word boundaries.
+    Long-form (video_duration > 60) yields one event per segment as words arrive,
+    so only the current segment is ever held in memory.
+    Shorts yield a single event showing the whole quote.
+    """
+    is_long_form = video_duration and video_duration > 60
+
+    if is_long_form:
+        for segment in _iter_segments(word_boundaries):
+            seg_start_ms = _ns_to_ms(segment[0]['offset'])
+            # Add small buffer at end of segment unless it's the next one immediately
+            seg_end_ms = _ns_to_ms(segment[-1]['offset'] + segment[-1]['duration']) + 300
+            text = _karaoke_text(_split_segment_lines(segment))
+            yield _dialogue(seg_start_ms, seg_end_ms, text)
+    else:
+        # Shorts Logic (Original) - Show everything at once (a single quote, so buffering is fine)
+        words = list(word_boundaries)
+        if not words:
+            return
+        quote_start_ms = _ns_to_ms(words[0]['offset'])
+        if video_duration:
+            quote_end_ms = int(round(video_duration * 1000))
+        else:
+            quote_end_ms = _ns_to_ms(words[-1]['offset'] + words[-1]['duration']) + 1000
+        text = _karaoke_text(_split_quote_lines(words))
+        yield _dialogue(quote_start_ms, quote_end_ms, text)
 
 def generate_karaoke_ass(word_boundaries, output_file, quote_text, keywords=None, video_duration=None, width=1080, height=1920):
     """
     Generates an .ass subtitle file with a single-event karaoke highlighting effect.
     The whole quote is shown at once, with words highlighted as they are spoken.
     If video_duration is provided, the caption stays until that time.
+    word_boundaries may be any iterable (list or generator); events are written
+    to the file as they are produced.
     """
     if keywords is None:
         keywords = []
@@ -39,134 +134,91 @@ Style: Default,Arial,80,&H0000FFFF,&H00FFFFFF,&H00000000,&H00000000,-1,0,0,0,100
 # Swapped: Primary is now Yellow (&H0000FFFF), Secondary is White (&H00FFFFFF)
 # In \k karaoke, Secondary is base color, Primary is highlight color.
 
-    if not word_boundaries:
+    # Peek the first word so empty input never creates a file
+    stream = iter(word_boundaries if word_boundaries is not None else [])
+    first = next(stream, None)
+    if first is None:
         logger.warning("No word boundaries provided for ASS generation.")
         return None
 
-    # Determine timing for the whole quote (used for logging and fallback)
-    quote_start_s = word_boundaries[0]['offset'] / 10**9
-    quote_end_s = video_duration if video_duration else (word_boundaries[-1]['offset'] + word_boundaries[-1]['duration']) / 10**9 + 1.0
+    def _words():
+        yield first
+        yield from stream
 
-    # segmentation logic
-    # For shorts, we show everything. For long-term, we show chunks.
-    is_long_form = video_duration and video_duration > 60
-    
-    events = []
-    
-    if is_long_form:
-        # Segment words into groups of ~10-15 words or ~2 lines
-        word_segments = []
-        current_segment = []
-        current_chars = 0
-        max_chars_per_segment = 50
-        
-        for boundary in word_boundaries:
-            word = boundary['text']
-            if current_chars + len(word) > max_chars_per_segment and current_segment:
-                word_segments.append(current_segment)
-                current_segment = []
-                current_chars = 0
-            
-            current_segment.append(boundary)
-            current_chars += len(word) + 1
-            
-        if current_segment:
-            word_segments.append(current_segment)
-            
-        for segment in word_segments:
-            seg_start_s = segment[0]['offset'] / 10**9
-            seg_end_s = (segment[-1]['offset'] + segment[-1]['duration']) / 10**9
-            
-            # Add small buffer at end of segment unless it's the next one immediately
-            seg_end_s += 0.3
-            
-            start_ts = format_ass_timestamp(seg_start_s)
-            end_ts = format_ass_timestamp(seg_end_s)
-            
-            event_start_ms = int(seg_start_s * 1000)
-            
-            # Group segment into 2 lines if possible
-            seg_lines = []
-            curr_line = []
-            curr_line_chars = 0
-            max_line_chars = 25
-            
-            for b in segment:
-                if curr_line_chars + len(b['text']) > max_line_chars and curr_line:
-                    seg_lines.append(curr_line)
-                    curr_line = []
-                    curr_line_chars = 0
-                curr_line.append(b)
-                curr_line_chars += len(b['text']) + 1
-            if curr_line:
-                seg_lines.append(curr_line)
-                
-            ass_text_parts = []
-            for line in seg_lines:
-                line_parts = []
-                for b in line:
-                    start_ms = int(b['offset'] / 10**6)
-                    dur_ms = int(b['duration'] / 10**6)
-                    rel_start = start_ms - event_start_ms
-                    rel_mid = rel_start + (dur_ms // 2)
-                    rel_end = rel_start + dur_ms
-                    k_dur = dur_ms // 10
-                    zoom_tag = f"{{\\k{k_dur}}}"
-                    line_parts.append(f"{zoom_tag}{b['text']}")
-                ass_text_parts.append(" ".join(line_parts))
-            
-            final_content = "\\N".join(ass_text_parts)
-            events.append(f"Dialogue: 0,{start_ts},{end_ts},Default,,0,0,0,,{final_content}")
-            
-    else:
-        # Shorts Logic (Original) - Show everything at once
-        start_ts = format_ass_timestamp(quote_start_s)
-        end_ts = format_ass_timestamp(quote_end_s)
-        event_start_ms = int(quote_start_s * 1000)
-        
-        max_chars_per_line = 25
-        lines = []
-        current_line_words = []
-        current_line_length = 0
-        
-        for boundary in word_boundaries:
-            word = boundary['text'].strip()
-            word_len = len(word)
-            if current_line_length + word_len + (1 if current_line_words else 0) > max_chars_per_line and current_line_words:
-                lines.append(current_line_words)
-                current_line_words = []
-                current_line_length = 0
-            current_line_words.append(boundary)
-            current_line_length += word_len + 1
-        if current_line_words:
-            lines.append(current_line_words)
-            
-        ass_text_parts = []
-        for line in lines:
-            line_parts = []
-            for boundary in line:
-                start_ms = int(boundary['offset'] / 10**6)
-                dur_ms = int(boundary['duration'] / 10**6)
-                rel_start = start_ms - event_start_ms
-                rel_mid = rel_start + (dur_ms // 2)
-                rel_end = rel_start + dur_ms
-                k_dur = dur_ms // 10
-                zoom_tag = f"{{\\k{k_dur}}}"
-                line_parts.append(f"{zoom_tag}{boundary['text']}")
-            ass_text_parts.append(" ".join(line_parts))
-            
-        final_content = "\\N".join(ass_text_parts)
-        events.append(f"Dialogue: 0,{start_ts},{end_ts},Default,,0,0,0,,{final_content}")
-
-    # Write to file
+    event_count = 0
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(header)
         f.write("\n[Events]\n")
         f.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
-        for event in events:
+        for event in iter_karaoke_events(_words(), video_duration=video_duration):
             f.write(event + "\n")
+            event_count += 1
 
-            
-    logger.info(f"Karaoke ASS subtitles saved to {output_file} (duration: {quote_end_s:.2f}s)")
+    logger.info(f"Karaoke ASS subtitles saved to {output_file} ({event_count} events)")
     return output_file
 
+# ---------------- SIDECAR CAPTION TRACKS ---------------- #
+def format_srt_timestamp_ms(ms):
+    """Integer milliseconds to SRT timestamp HH:MM:SS,mmm"""
+    if ms < 0:
+        ms = 0
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+
+def format_vtt_timestamp_ms(ms):
+    """Integer milliseconds to WebVTT timestamp HH:MM:SS.mmm"""
+    return format_srt_timestamp_ms(ms).replace(",", ".")
+
+def iter_caption_cues(word_boundaries, max_chars_per_cue=50):
+    """
+    Generator of (start_ms, end_ms, text) cues for sidecar caption tracks.
+    Uses the same word grouping as the long-form karaoke segments; a cue never
+    overlaps the next one so players don't stack them.
+    """
+    pending = None
+    for segment in _iter_segments(word_boundaries, max_chars_per_segment=max_chars_per_cue):
+        start_ms = _ns_to_ms(segment[0]['offset'])
+        end_ms = _ns_to_ms(segment[-1]['offset'] + segment[-1]['duration']) + 300
+        text = "\n".join(" ".join(b['text'].strip() for b in line) for line in _split_segment_lines(segment))
+        if pending:
+            yield pending[0], min(pending[1], start_ms), pending[2]
+        pending = (start_ms, end_ms, text)
+    if pending:
+        yield pending
+
+def write_caption_tracks(word_boundaries, base_path, formats=("srt", "vtt")):
+    """
+    Writes SRT and/or WebVTT caption files from the word timeline in a single pass.
+    base_path is the output path without extension.
+    Returns dict mapping format -> file path, or {} if there are no words.
+    """
+    formats = [fmt.lower() for fmt in formats if fmt.lower() in ("srt", "vtt")]
+    if not formats:
+        return {}
+
+    paths = {fmt: f"{base_path}.{fmt}" for fmt in formats}
+    files = {fmt: open(path, 'w', encoding='utf-8') for fmt, path in paths.items()}
+    cue_count = 0
+    try:
+        if 'vtt' in files:
+            files['vtt'].write("WEBVTT\n\n")
+        for start_ms, end_ms, text in iter_caption_cues(word_boundaries):
+            cue_count += 1
+            if 'srt' in files:
+                files['srt'].write(f"{cue_count}\n{format_srt_timestamp_ms(start_ms)} --> {format_srt_timestamp_ms(end_ms)}\n{text}\n\n")
+            if 'vtt' in files:
+                files['vtt'].write(f"{format_vtt_timestamp_ms(start_ms)} --> {format_vtt_timestamp_ms(end_ms)}\n{text}\n\n")
+    finally:
+        for f in files.values():
+            f.close()
+
+    if not cue_count:
+        logger.warning("No word boundaries provided for caption tracks.")
+        for path in paths.values():
+            os.remove(path)
+        return {}
+
+    logger.info(f"Caption tracks saved: {', '.join(paths.values())} ({cue_count} cues)")
+    return paths
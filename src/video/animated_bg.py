@@ -0,0 +1,104 @@
+import hashlib
+import random
+import colorsys
+import logging
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Animated backgrounds generated inside the ffmpeg graph (no downloads, no files):
+# a slowly rotating lavfi `gradients` base, optionally textured with a blurred
+# `life` / `cellauto` pattern, with a slow hue drift and the usual vignette.
+STYLES = ("gradients", "life", "cellauto")
+
+# Sources render at a fraction of the output size and are upscaled; everything is
+# smooth or blurred, so this is indistinguishable and keeps the sources cheap.
+BASE_DOWNSCALE = 4
+TEXTURE_DOWNSCALE = 12
+# Generations per second for life/cellauto, crossfaded up to the output rate
+TEXTURE_RATE = 6
+# Elementary automaton rules with pleasant organic structure
+CELLAUTO_RULES = (18, 30, 45, 90, 110, 150)
+
+def seed_for(topic):
+    """Stable 32-bit seed for a topic (str hash() is randomized per process)."""
+    return int(hashlib.sha1(str(topic).encode('utf-8')).hexdigest()[:8], 16)
+
+def _color(hue, saturation, value):
+    r, g, b = colorsys.hsv_to_rgb(hue % 1.0, saturation, value)
+    return f"0x{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
+
+def _even(value):
+    return max(2, int(value) // 2 * 2)
+
+def describe(seed, style=None):
+    """The parameters a seed maps to (palette, style, motion); same seed, same background."""
+    rng = random.Random(seed)
+    hue = rng.random()
+    return {
+        "style": style or rng.choice(STYLES),
+        # Dark, related colors so white captions stay readable
+        "colors": [
+            _color(hue, 0.7, 0.25),
+            _color(hue + rng.uniform(0.08, 0.2), 0.6, 0.45),
+            _color(hue + rng.uniform(0.3, 0.5), 0.5, 0.35),
+        ],
+        "speed": rng.uniform(0.004, 0.012),
+        "hue_drift": rng.uniform(1.5, 4.0),  # degrees per second
+        "rule": rng.choice(CELLAUTO_RULES),
+        "fill_ratio": rng.uniform(0.2, 0.45),
+    }
+
+def build_stream(width, height, fps, duration, seed=0, style=None, start=0.0, vignette_angle='0.5'):
+    """
+    Animated background stream for the [start, start + duration) window of the timeline.
+    The lavfi sources are deterministic for a seed, so parallel segments line up.
+    """
+    params = describe(seed, style)
+    base_w, base_h = _even(width / BASE_DOWNSCALE), _even(height / BASE_DOWNSCALE)
+    c0, c1, c2 = params["colors"]
+
+    video = ffmpeg.input(
+        f"gradients=s={base_w}x{base_h}:r={fps}:n=3:c0={c0}:c1={c1}:c2={c2}"
+        f":speed={params['speed']:.5f}:seed={seed % 4294967295}",
+        f='lavfi'
+    ).video
+
+    if params["style"] in ("life", "cellauto"):
+        tex_w, tex_h = _even(width / TEXTURE_DOWNSCALE), _even(height / TEXTURE_DOWNSCALE)
+        if params["style"] == "life":
+            source = (
+                f"life=s={tex_w}x{tex_h}:r={TEXTURE_RATE}:seed={seed % 4294967295}"
+                f":ratio={params['fill_ratio']:.3f}:mold=25:life_color=white:death_color=black:mold_color=0x303030"
+            )
+        else:
+            source = (
+                f"cellauto=s={tex_w}x{tex_h}:r={TEXTURE_RATE}:rule={params['rule']}"
+                f":seed={seed % 4294967295}:ratio={params['fill_ratio']:.3f}"
+            )
+        texture = (
+            ffmpeg.input(source, f='lavfi')
+            .video
+            .filter('fps', fps=fps)
+            # Crossfade between generations instead of snapping
+            .filter('tmix', frames=max(2, round(fps / TEXTURE_RATE)))
+            .filter('scale', base_w, base_h, flags='bicubic')
+            .filter('gblur', sigma=2.5)
+            .filter('format', 'gbrp')
+        )
+        video = ffmpeg.filter(
+            [video.filter('format', 'gbrp'), texture],
+            'blend', all_mode='softlight', all_opacity=0.55
+        )
+
+    # Cut the window at the low resolution, before any full-size work
+    video = video.filter('trim', start=round(start, 3), duration=round(duration, 3)).filter('setpts', 'PTS-STARTPTS')
+    video = (
+        video
+        .filter('scale', width, height, flags='bicubic')
+        .filter('setsar', 1)
+        .filter('hue', h=f"{params['hue_drift']:.2f}*(t+{start:.3f})")
+    )
+    if vignette_angle:
+        video = video.filter('vignette', angle=vignette_angle)
+    return video.filter('format', 'yuv420p')
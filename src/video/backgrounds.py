@@ -0,0 +1,183 @@
+import math
+import random
+import logging
+import ffmpeg
+from src.utils import media_probe
+
+logger = logging.getLogger(__name__)
+
+def get_clip_duration(path):
+    """Container duration of a background clip in seconds (None if it can't be probed)."""
+    duration = media_probe.get_duration(path)
+    if not duration:
+        logger.warning(f"Could not determine duration of background clip {path}")
+    return duration
+
+def _loops_needed(offset, duration, clip_duration):
+    """Extra stream_loop passes needed to play `duration` seconds starting `offset` into a clip."""
+    return max(0, math.ceil((offset + duration) / clip_duration - 1e-9) - 1)
+
+def plan_background_sequence(clips, total_duration):
+    """
+    Plans how long each clip plays so the sequence covers total_duration.
+    clips: list of (path, clip_duration) in playback order.
+    If the clips together are long enough they play once each (the last one trimmed);
+    otherwise every clip is stretched by the same factor using input-side looping.
+    Returns list of dicts: path, clip_duration, offset (seek into the clip),
+    duration (seconds to play), loops (extra passes for stream_loop).
+    """
+    clips = [(path, d) for path, d in clips if d and d > 0]
+    if not clips or total_duration <= 0:
+        return []
+
+    available = sum(d for _, d in clips)
+    plan = []
+    if available >= total_duration:
+        remaining = total_duration
+        for path, d in clips:
+            take = min(d, remaining)
+            plan.append({"path": path, "clip_duration": d, "offset": 0.0, "duration": take, "loops": 0})
+            remaining -= take
+            if remaining <= 1e-6:
+                break
+    else:
+        factor = total_duration / available
+        for path, d in clips:
+            take = d * factor
+            plan.append({"path": path, "clip_duration": d, "offset": 0.0, "duration": take, "loops": _loops_needed(0.0, take, d)})
+        # Absorb float drift in the last entry
+        drift = total_duration - sum(p["duration"] for p in plan)
+        plan[-1]["duration"] += drift
+
+    return plan
+
+def plan_single_clip(path, clip_duration, total_duration, rng=random):
+    """
+    Picks the window of one background clip to show for total_duration seconds.
+    A clip longer than needed starts at a random offset and plays once; a shorter one
+    starts at 0 and loops just enough. If the duration is unknown the clip loops
+    indefinitely (stream_loop=-1), cut by `t`.
+    Returns a one-entry sequence plan (same shape as plan_background_sequence).
+    """
+    if total_duration <= 0:
+        return []
+    if not clip_duration or clip_duration <= 0:
+        return [{"path": path, "clip_duration": None, "offset": 0.0, "duration": total_duration, "loops": -1}]
+
+    offset = 0.0
+    if clip_duration > total_duration:
+        offset = rng.uniform(0.0, clip_duration - total_duration)
+    return [{
+        "path": path,
+        "clip_duration": clip_duration,
+        "offset": offset,
+        "duration": total_duration,
+        "loops": _loops_needed(offset, total_duration, clip_duration),
+    }]
+
+def plan_clip_ranges(clips, total_duration):
+    """
+    Turns pre-planned clip ranges into a sequence plan.
+    clips: list of dicts with path, clip_duration (probed), in, out, in playback order.
+    Ranges are clamped to the real clip length and the sequence is cut at total_duration.
+    If the ranges come up short (e.g. a download failed) the last clip is looped to fill.
+    """
+    if total_duration <= 0:
+        return []
+    plan = []
+    remaining = total_duration
+    for clip in clips:
+        clip_duration = clip.get("clip_duration")
+        if not clip_duration or clip_duration <= 0:
+            continue
+        start = min(max(0.0, clip["in"]), clip_duration)
+        end = min(clip["out"], clip_duration)
+        if end - start < 1e-3:
+            start, end = 0.0, clip_duration
+        take = min(end - start, remaining)
+        plan.append({"path": clip["path"], "clip_duration": clip_duration, "offset": start, "duration": take, "loops": 0})
+        remaining -= take
+        if remaining <= 1e-6:
+            break
+
+    if plan and remaining > 1e-6:
+        last = plan[-1]
+        last["duration"] += remaining
+        last["loops"] = _loops_needed(last["offset"], last["duration"], last["clip_duration"])
+    return plan
+
+def slice_plan(plan, start, length):
+    """
+    Cuts the [start, start + length) window out of a sequence plan, e.g. for one
+    segment of a parallel encode. Offsets point into the (looped) clips.
+    """
+    sliced = []
+    position = 0.0
+    end = start + length
+    for entry in plan:
+        entry_start, entry_end = position, position + entry["duration"]
+        position = entry_end
+        if entry_end <= start + 1e-6 or entry_start >= end - 1e-6:
+            continue
+        clip_duration = entry["clip_duration"]
+        # Seconds into this entry's (looped) playback, folded back into a single pass of the clip
+        into_entry = max(0.0, start - entry_start) + entry["offset"]
+        offset = into_entry % clip_duration
+        duration = min(entry_end, end) - max(entry_start, start)
+        # Other keys (e.g. `normalized`) carry over
+        sliced.append(dict(
+            entry,
+            offset=offset,
+            duration=duration,
+            loops=_loops_needed(offset, duration, clip_duration),
+        ))
+    return sliced
+
+def _open_entry(entry):
+    """
+    The entry's [offset, offset + duration) window of its (looped) clip as a video stream.
+    Never combines -ss with -stream_loop: ffmpeg takes the loop length from the first,
+    seek-shortened pass, so clips with frequent keyframes lost frames on every loop
+    (e.g. slices of a parallel long-form encode that start mid-clip). Looped entries
+    start at 0 and the offset is trimmed off in the graph: at most one pass of waste.
+    """
+    offset = round(entry.get("offset") or 0.0, 3)
+    duration = round(entry["duration"], 3)
+    if entry["loops"]:
+        segment = ffmpeg.input(entry["path"], stream_loop=entry["loops"], t=round(offset + duration, 3)).video
+        if offset:
+            segment = segment.filter('trim', start=offset).filter('setpts', 'PTS-STARTPTS')
+        return segment
+    # Input-side seek: only the needed part of the clip is decoded
+    input_kwargs = {"t": duration}
+    if offset:
+        input_kwargs["ss"] = offset
+    return ffmpeg.input(entry["path"], **input_kwargs).video
+
+def build_background_stream(plan, width, height, fps, vignette_angle=None):
+    """
+    Builds the background video stream from a sequence plan.
+    Each clip is its own input limited with stream_loop/t before decoding, normalized
+    to the output size, then joined with the concat filter, so ffmpeg only ever holds
+    a few decoded frames per clip instead of buffering the whole timeline.
+    Entries marked `normalized` (mezzanine.normalize_plan) are already at the output
+    size, fps and vignette, and are used as decoded.
+    """
+    segments = []
+    for entry in plan:
+        segment = _open_entry(entry)
+        if not entry.get("normalized"):
+            segment = (
+                segment
+                .filter('scale', width, height, force_original_aspect_ratio='increase')
+                .filter('crop', width, height)
+                .filter('setsar', 1)
+            )
+            if vignette_angle:
+                segment = segment.filter('vignette', angle=vignette_angle)
+        # Also regularizes timestamps across stream_loop passes (cheap on normalized clips)
+        segments.append(segment.filter('fps', fps=fps))
+
+    if len(segments) == 1:
+        return segments[0]
+    return ffmpeg.concat(*segments, v=1, a=0)
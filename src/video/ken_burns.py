@@ -0,0 +1,60 @@
+import math
+import logging
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Same motion as the old zoompan (z='min(zoom+0.0005,1.1)' at 30 fps): a slow
+# centered zoom to 110% over ~6.7 seconds, then hold.
+ZOOM_RATE = 0.015 # zoom per second
+MAX_ZOOM = 1.1
+
+def ramp_frames(fps, zoom_rate=ZOOM_RATE, max_zoom=MAX_ZOOM):
+    """Output frames until the zoom reaches max_zoom."""
+    return max(1, int(math.ceil((max_zoom - 1.0) * fps / zoom_rate - 1e-9)))
+
+def _cover(image_path, width, height):
+    # One decoded frame, scaled once to cover the output size
+    return (
+        ffmpeg.input(image_path)
+        .filter('scale', width, height, force_original_aspect_ratio='increase')
+        .filter('crop', width, height)
+    )
+
+def build_stream(image_path, duration, width, height, fps, start=0.0, vignette_angle='0.5', zoom_rate=ZOOM_RATE, max_zoom=MAX_ZOOM):
+    """
+    Ken Burns background for the [start, start + duration) window of the timeline.
+    zoompan only renders the zoom ramp (a few seconds of frames); the rest of the
+    timeline repeats the last frame with tpad. The static vignette and the yuv420p
+    conversion run on the ramp frames only, so held frames are not filtered again.
+    Previously zoompan and vignette ran on every output frame at full size.
+    """
+    ramp = ramp_frames(fps, zoom_rate, max_zoom)
+    ramp_seconds = ramp / fps
+    step = zoom_rate / fps
+    zoompan_kwargs = {
+        'x': 'iw/2-(iw/zoom/2)',
+        'y': 'ih/2-(ih/zoom/2)',
+        's': f'{width}x{height}',
+        'fps': fps,
+    }
+
+    if start < ramp_seconds:
+        # 'on' is the output frame number; matches the old per-frame increment at 30 fps
+        video = _cover(image_path, width, height).filter('zoompan', z=f'min(1+{step}*(on+1),{max_zoom})', d=ramp, **zoompan_kwargs)
+        hold = start + duration - ramp_seconds
+    else:
+        # Window starts after the ramp: only the fully zoomed frame is needed
+        video = _cover(image_path, width, height).filter('zoompan', z=str(max_zoom), d=1, **zoompan_kwargs)
+        hold = duration
+
+    # zoompan stamps frames in the image's timebase; renumber them so tpad extends them correctly
+    video = video.filter('setpts', f'N/({fps}*TB)')
+    if vignette_angle:
+        video = video.filter('vignette', angle=vignette_angle)
+    video = video.filter('format', 'yuv420p')
+    if hold > 0:
+        video = video.filter('tpad', stop_mode='clone', stop_duration=round(hold + 1.0 / fps, 3))
+    if 0 < start < ramp_seconds:
+        return video.filter('trim', start=start, duration=duration).filter('setpts', 'PTS-STARTPTS')
+    return video.filter('trim', duration=duration)
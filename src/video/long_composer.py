@@ -1,50 +1,185 @@
 import ffmpeg
 import os
+import math
+import shutil
 import logging
-import random
-from mutagen.mp3 import MP3
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import audio_analysis, audio_mix, font_setup, ffmpeg_runner
+from src.video import render_profiles, render_outputs, backgrounds, mezzanine, ken_burns, animated_bg
 
 logger = logging.getLogger(__name__)
 
 def get_audio_duration(file_path):
+    return audio_analysis.get_audio_duration(file_path)
+
+def get_video_duration(audio_path):
+    """Long-form length: measured end of speech plus 2 seconds of padding."""
+    analysis = audio_analysis.analyze_audio(audio_path)
+    return analysis['speech_end'] + 2.0
+
+def _build_visual(plan, image_path, start, length, width, height, fps, subtitle_path=None, animated_background=None):
+    """
+    Background (video sequence, animated lavfi background or still image) plus
+    karaoke subtitles for the [start, start + length) window of the timeline.
+    """
+    if plan:
+        window = backgrounds.slice_plan(plan, start, length)
+        video = backgrounds.build_background_stream(window, width, height, fps, vignette_angle='0.5')
+        video = video.filter('trim', duration=length)
+    elif animated_background:
+        video = animated_bg.build_stream(width, height, fps, length, start=start, vignette_angle='0.5', **animated_background)
+    else:
+        video = ken_burns.build_stream(image_path, length, width, height, fps, start=start, vignette_angle='0.5')
+
+    # Add Subtitles (ASS Karaoke)
+    if subtitle_path and os.path.exists(subtitle_path):
+        safe_subtitle_path = font_setup.ffmpeg_filter_path(subtitle_path)
+        fonts = font_setup.get_font_setup()
+        subtitle_kwargs = {}
+        if fonts['fonts_dir']:
+            subtitle_kwargs['fontsdir'] = font_setup.ffmpeg_filter_path(fonts['fonts_dir'])
+        if start > 0:
+            # Shift frames onto the global timeline so libass picks the right events, then back
+            video = (
+                video
+                .filter('setpts', f'PTS+{start}/TB')
+                .filter('subtitles', safe_subtitle_path, **subtitle_kwargs)
+                .filter('setpts', 'PTS-STARTPTS')
+            )
+        else:
+            video = video.filter('subtitles', safe_subtitle_path, **subtitle_kwargs)
+    return video
+
+def plan_segments(video_duration, fps, segments, min_segment_seconds=20.0):
+    """
+    Splits the timeline into up to `segments` windows whose boundaries fall on
+    frame boundaries. Every segment is encoded separately, so each starts on a keyframe.
+    Returns list of (start_seconds, frame_count).
+    """
+    total_frames = int(math.ceil(video_duration * fps))
+    count = max(1, min(segments, int(video_duration // min_segment_seconds)))
+    frames_per_segment = int(math.ceil(total_frames / count))
+    windows = []
+    for first_frame in range(0, total_frames, frames_per_segment):
+        frame_count = min(frames_per_segment, total_frames - first_frame)
+        windows.append((first_frame / fps, frame_count))
+    return windows
+
+def resolve_segment_count(parallel_segments=None):
+    """0/None = one segment per CPU core (capped at 8); 1 disables segmenting."""
+    if parallel_segments is None or parallel_segments <= 0:
+        return max(1, min(os.cpu_count() or 1, 8))
+    return parallel_segments
+
+def _write_concat_list(list_path, paths):
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return list_path
+
+def _encode_segments_parallel(windows, plan, image_path, subtitle_path, audio_bed_path, video_duration, profile, output_file, thumbnail_path=None, thumbnail_time=None, preview_path=None, animated_background=None):
+    """
+    Encodes each window in its own ffmpeg process, then joins them with the concat
+    demuxer and muxes the pre-mixed audio bed, all without re-encoding.
+    The thumbnail is grabbed by the segment that contains thumbnail_time; preview
+    parts are split off every segment and joined the same way.
+    """
+    width, height, fps = profile['width'], profile['height'], profile['fps']
+    parts_dir = f"{output_file}.parts"
+    os.makedirs(parts_dir, exist_ok=True)
+
+    # Split the CPU between the concurrent encoders
+    threads = max(1, (os.cpu_count() or 1) // len(windows))
+    x264_args = render_profiles.x264_output_args(profile, still_image=not (plan or animated_background))
+    x264_args['threads'] = threads
+
+    segment_paths = []
+    preview_paths = []
+    jobs = []
+    for i, (start, frame_count) in enumerate(windows):
+        length = frame_count / fps
+        segment_path = os.path.join(parts_dir, f"segment_{i:03d}.mp4")
+        segment_paths.append(segment_path)
+        video = _build_visual(plan, image_path, start, length, width, height, fps, subtitle_path, animated_background)
+
+        segment_thumbnail_time = None
+        if thumbnail_path and thumbnail_time is not None and start <= thumbnail_time < start + length:
+            segment_thumbnail_time = thumbnail_time - start
+        preview_part = os.path.join(parts_dir, f"preview_{i:03d}.mp4") if preview_path else None
+        if preview_part:
+            preview_paths.append(preview_part)
+        video, side_outputs = render_outputs.split_side_outputs(
+            video, fps,
+            thumbnail_path=thumbnail_path, thumbnail_time=segment_thumbnail_time,
+            preview_path=preview_part, duration=length
+        )
+
+        job = ffmpeg.output(video, segment_path, an=None, vframes=frame_count, **x264_args)
+        if side_outputs:
+            job = ffmpeg.merge_outputs(job, *side_outputs)
+        jobs.append((job, f"segment {i + 1}/{len(windows)}", length))
+
     try:
-        audio = MP3(file_path)
-        return audio.info.length
-    except Exception:
-        # Fallback using ffmpeg probe
-        probe = ffmpeg.probe(file_path)
-        return float(probe['format']['duration'])
-
-def create_long_video(audio_path, quote_text, explanation_text, music_dir="assets/music", output_file="assets/output/long_video.mp4", subtitle_path=None, background_video_paths=None, image_path=None):
+        logger.info(f"Encoding {len(windows)} segments in parallel ({threads} thread(s) each)...")
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = [pool.submit(ffmpeg_runner.run, job, label=label, expected_duration=length) for job, label, length in jobs]
+            for future in futures:
+                future.result()
+
+        playlist_path = _write_concat_list(os.path.join(parts_dir, "segments.txt"), segment_paths)
+        joined_video = ffmpeg.input(playlist_path, f='concat', safe=0)
+        joined_audio = ffmpeg.input(audio_bed_path)
+        joined = ffmpeg.output(joined_video.video, joined_audio.audio, output_file, c='copy', t=video_duration)
+        ffmpeg_runner.run(joined, label="concat", expected_duration=video_duration)
+
+        if preview_paths:
+            preview_list = _write_concat_list(os.path.join(parts_dir, "previews.txt"), preview_paths)
+            joined_preview = ffmpeg.output(
+                ffmpeg.input(preview_list, f='concat', safe=0).video,
+                joined_audio.audio,
+                preview_path, c='copy', t=video_duration
+            )
+            ffmpeg_runner.run(joined_preview, label="preview concat", expected_duration=video_duration)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+def create_long_video(audio_path, quote_text, explanation_text, music_dir="assets/music", output_file="assets/output/long_video.mp4", subtitle_path=None, background_video_paths=None, image_path=None, render_profile=None, parallel_segments=None, min_segment_seconds=20.0, ducking=False, thumbnail_path=None, thumbnail_at=0.3, preview_path=None, background_clips=None, mezzanine_cache=False, animated_background=None):
     """
     Composes a 16:9 long-form video using FFmpeg.
     background_video_paths can be a string (single path) or a list of paths.
+    background_clips: pre-planned clips (dicts with path, in, out) played in order instead.
+    mezzanine_cache: use cached pre-normalized copies of the background clips.
+    animated_background: {"seed": ..., "style": ...} to generate the background inside
+    the ffmpeg graph (animated_bg) when there are no clips and no image.
+    render_profile is a resolved landscape profile (defaults to 'standard': 1920x1080 @ 30 fps).
+    parallel_segments: number of segments encoded concurrently (0/None = one per core, 1 = single pass).
+    min_segment_seconds: shorter timelines use fewer segments (or a single pass).
+    ducking lowers the music under the voice.
+    thumbnail_path / preview_path: also write a JPEG thumbnail (frame at thumbnail_at,
+    a fraction of the duration) and a low-res preview MP4 from the same render pass.
     """
     try:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
         # 1. Determine constraints
-        voice_duration = get_audio_duration(audio_path)
-        # Add a bit of padding at the end
-        video_duration = voice_duration + 2.0
-        
-        # 2. Prepare Inputs
-        input_voice = ffmpeg.input(audio_path)
-        
-        # 3. Background Music Selection
-        music_files = [f for f in os.listdir(music_dir) if f.endswith('.mp3') or f.endswith('.ogg')] if os.path.isdir(music_dir) else []
-        if music_files:
-            music_path = os.path.join(music_dir, random.choice(music_files))
-            # Use stream_loop on input for infinite looping without buffer size issues
-            input_music = ffmpeg.input(music_path, stream_loop=-1).filter('volume', 0.15) 
-            bg_music = input_music.filter('atrim', duration=video_duration)
-            final_audio = ffmpeg.filter([input_voice, bg_music], 'amix', inputs=2, duration='first')
-        else:
-            final_audio = input_voice
+        # Add a bit of padding after the last spoken word
+        video_duration = get_video_duration(audio_path)
 
-        # 4. Background Visual
-        if background_video_paths:
+        profile = render_profile or render_profiles.get_render_profile(orientation="landscape")
+        width, height, fps = profile['width'], profile['height'], profile['fps']
+        
+        # 3. Background Visual
+        plan = None
+        if background_clips:
+            clips = [dict(clip, clip_duration=backgrounds.get_clip_duration(clip['path'])) for clip in background_clips if os.path.exists(clip['path'])]
+            logger.info(f"Using {len(clips)} planned background clip(s) for long-form.")
+            plan = backgrounds.plan_clip_ranges(clips, video_duration)
+            if not plan:
+                logger.error("No usable planned background clips found.")
+                return None
+        elif background_video_paths:
             if isinstance(background_video_paths, str):
                 background_video_paths = [background_video_paths]
             
@@ -56,58 +191,64 @@ def create_long_video(audio_path, quote_text, explanation_text, music_dir="asset
                  return None
 
             logger.info(f"Using {len(background_video_paths)} video background(s) for long-form.")
-            
-            processed_clips = []
-            for path in background_video_paths:
-                clip = (
-                    ffmpeg.input(path)
-                    .filter('scale', 1920, 1080, force_original_aspect_ratio='increase')
-                    .filter('crop', 1920, 1080)
-                )
-                processed_clips.append(clip)
-            
-            # If we have multiple clips, we cycle them or just concat
-            # To cycle until duration is met, we might need a more complex filter or just loop the concat
-            if len(processed_clips) > 1:
-                # Simple concatenation. For the loop filter, we use a safer size limit (32767) 
-                # supported by older FFmpeg builds. For video frames, this is plenty.
-                video = ffmpeg.concat(*processed_clips, v=1, a=0).filter('loop', loop=-1, size=32767)
-            else:
-                # For single video, we can just use loop filter with safe size
-                video = processed_clips[0].filter('loop', loop=-1, size=32767)
-            
-            video = video.filter('trim', duration=video_duration).filter('vignette', angle='0.5')
-            
+
+            # Sequence clips with per-clip stream_loop/t sized from the voice duration.
+            # (The old concat + loop filter buffered up to 32767 decoded frames in RAM.)
+            clip_durations = [(p, backgrounds.get_clip_duration(p)) for p in background_video_paths]
+            plan = backgrounds.plan_background_sequence(clip_durations, video_duration)
+            if not plan:
+                logger.error("Could not determine durations of background videos.")
+                return None
         elif image_path and os.path.exists(image_path):
-            input_visual = ffmpeg.input(image_path, loop=1, t=video_duration)
-            video = (
-                input_visual
-                .filter('scale', 1920, 1080, force_original_aspect_ratio='increase')
-                .filter('crop', 1920, 1080)
-                .filter('vignette', angle='0.5')
-            )
+             animated_background = None
+        elif animated_background:
+             logger.info(f"Using animated background for long-form: {animated_background}")
         else:
              logger.error("No visual input provided for long-form video.")
              return None
 
-        # 5. Add Subtitles (ASS Karaoke)
-        if subtitle_path and os.path.exists(subtitle_path):
-            safe_subtitle_path = subtitle_path.replace('\\', '/').replace(':', '\\:')
-            video = video.filter('subtitles', safe_subtitle_path)
-        
-        # 6. Final Output
-        out = ffmpeg.output(
-            video, 
-            final_audio, 
-            output_file, 
-            vcodec='libx264', 
-            acodec='aac', 
-            t=video_duration,
-            pix_fmt='yuv420p',
-            r=30
-        )
-        
-        out.run(overwrite_output=True, quiet=True)
+        if plan and mezzanine_cache:
+            # Scale/crop/fps/vignette done once per clip and cached; segments then only seek and join
+            plan = mezzanine.normalize_plan(plan, width, height, fps, vignette_angle='0.5')
+
+        # 4. Voice + Background Music, pre-mixed into one AAC file (muxed with a stream copy)
+        audio_bed_path = f"{os.path.splitext(output_file)[0]}_audio.m4a"
+        if not audio_mix.build_audio_bed(audio_path, video_duration, audio_bed_path, music_dir=music_dir, music_volume=0.15, ducking=ducking):
+            return None
+
+        # 5. Encode: keyframe-aligned segments in parallel, or a single pass for short timelines
+        try:
+            windows = plan_segments(video_duration, fps, resolve_segment_count(parallel_segments), min_segment_seconds)
+            thumbnail_time = video_duration * thumbnail_at
+            if len(windows) > 1:
+                _encode_segments_parallel(
+                    windows, plan, image_path, subtitle_path, audio_bed_path, video_duration, profile, output_file,
+                    thumbnail_path=thumbnail_path, thumbnail_time=thumbnail_time, preview_path=preview_path,
+                    animated_background=animated_background
+                )
+            else:
+                video = _build_visual(plan, image_path, 0, video_duration, width, height, fps, subtitle_path, animated_background)
+                final_audio = ffmpeg.input(audio_bed_path).audio
+                video, side_outputs = render_outputs.split_side_outputs(
+                    video, fps,
+                    thumbnail_path=thumbnail_path, thumbnail_time=thumbnail_time,
+                    preview_path=preview_path, preview_audio=final_audio, duration=video_duration
+                )
+                out = ffmpeg.output(
+                    video, 
+                    final_audio, 
+                    output_file, 
+                    acodec='copy', 
+                    t=video_duration,
+                    **render_profiles.x264_output_args(profile, still_image=not (plan or animated_background))
+                )
+                if side_outputs:
+                    out = ffmpeg.merge_outputs(out, *side_outputs)
+                ffmpeg_runner.run(out, label="long-form", expected_duration=video_duration)
+        finally:
+            if os.path.exists(audio_bed_path):
+                os.remove(audio_bed_path)
+
         logger.info(f"Long-form video created successfully: {output_file}")
         return output_file
 
@@ -0,0 +1,102 @@
+import os
+import hashlib
+import logging
+import ffmpeg
+from src.utils import ffmpeg_runner, media_probe
+
+logger = logging.getLogger(__name__)
+
+MEZZANINE_CACHE_DIR = "assets/cache/mezzanine"
+CACHE_VERSION = 1
+MAX_CACHE_BYTES = 4 * 1024 ** 3
+
+# Near-lossless intermediate with a keyframe every second and no B-frames,
+# so input-side seeks into it only decode a few frames
+GOP_SECONDS = 1
+MEZZANINE_ARGS = {
+    "vcodec": "libx264",
+    "preset": "veryfast",
+    "crf": 16,
+    "pix_fmt": "yuv420p",
+    "bf": 0,
+    "sc_threshold": 0,
+}
+
+def _cache_path(clip_path, width, height, fps, vignette_angle, cache_dir):
+    st = os.stat(clip_path)
+    raw = f"{CACHE_VERSION}|{os.path.abspath(clip_path)}|{st.st_size}|{st.st_mtime_ns}|{width}x{height}@{fps}|{vignette_angle}"
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(clip_path))[0]}_{width}x{height}_{digest}.mp4")
+
+def _prune_cache(cache_dir, max_bytes=MAX_CACHE_BYTES, keep=()):
+    """Deletes least recently used mezzanines beyond max_bytes."""
+    files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.mp4') and not f.endswith('.tmp.mp4')]
+    files.sort(key=os.path.getmtime, reverse=True)
+    total = 0
+    for path in files:
+        size = os.path.getsize(path)
+        if total + size > max_bytes and path not in keep:
+            try:
+                os.remove(path)
+                continue
+            except OSError:
+                pass
+        total += size
+
+def get_mezzanine(clip_path, width, height, fps, vignette_angle=None, cache_dir=MEZZANINE_CACHE_DIR):
+    """
+    The clip transcoded once at exactly width x height, fps and yuv420p (cover scale +
+    center crop, optional static vignette baked in), cached by source file and target.
+    Portrait and landscape renders each get their own variant.
+    Returns the cached path, or None if the transcode failed.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        mezzanine_path = _cache_path(clip_path, width, height, fps, vignette_angle, cache_dir)
+        if os.path.exists(mezzanine_path):
+            os.utime(mezzanine_path)
+            return mezzanine_path
+
+        video = (
+            ffmpeg.input(clip_path)
+            .video
+            .filter('scale', width, height, force_original_aspect_ratio='increase')
+            .filter('crop', width, height)
+            .filter('setsar', 1)
+            .filter('fps', fps=fps)
+        )
+        if vignette_angle:
+            video = video.filter('vignette', angle=vignette_angle)
+
+        tmp_path = f"{mezzanine_path}.tmp.mp4"
+        out = ffmpeg.output(
+            video, tmp_path, an=None, g=fps * GOP_SECONDS, keyint_min=fps * GOP_SECONDS,
+            movflags='+faststart', **MEZZANINE_ARGS
+        )
+        ffmpeg_runner.run(out, label="mezzanine", expected_duration=media_probe.get_duration(clip_path))
+        os.replace(tmp_path, mezzanine_path)
+        _prune_cache(cache_dir, keep={mezzanine_path})
+        logger.info(f"Normalized {os.path.basename(clip_path)} to {width}x{height} @ {fps} fps: {mezzanine_path}")
+        return mezzanine_path
+    except Exception as e:
+        stderr = getattr(e, 'stderr', None)
+        logger.warning(f"Could not normalize {clip_path}: {stderr.decode('utf8', 'replace') if stderr else e}")
+        return None
+
+def normalize_plan(plan, width, height, fps, vignette_angle=None, cache_dir=MEZZANINE_CACHE_DIR):
+    """
+    Points every entry of a background sequence plan at its mezzanine and marks it
+    `normalized`, so build_background_stream skips scaling, cropping, fps conversion
+    and the vignette. Entries whose clip can't be normalized are left as they are.
+    """
+    mezzanines = {}
+    normalized = []
+    for entry in plan:
+        path = entry["path"]
+        if path not in mezzanines:
+            mezzanines[path] = get_mezzanine(path, width, height, fps, vignette_angle, cache_dir)
+        mezzanine_path = mezzanines[path]
+        if mezzanine_path:
+            entry = dict(entry, path=mezzanine_path, normalized=True)
+        normalized.append(entry)
+    return normalized
@@ -0,0 +1,117 @@
+import os
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CARD_CACHE_DIR = "assets/cache/quote_cards"
+CACHE_VERSION = 1
+MAX_CACHED_CARDS = 50
+
+# Same look as the old drawtext overlay; sizes are for 1920px tall output
+QUOTE_STYLE = {
+    "font_size": 70,
+    "line_spacing": 15,
+    "shadow_offset": 5,
+    "fill": (255, 255, 255, 255),
+    "shadow": (0, 0, 0, 255),
+    "max_width_ratio": 0.85, # share of the frame width a line may use
+    "max_lines": 5,
+}
+
+def _load_font(font_file, size):
+    from PIL import ImageFont
+    if font_file:
+        try:
+            return ImageFont.truetype(font_file, size)
+        except OSError as e:
+            logger.warning(f"Could not load font {font_file}: {e}")
+    return ImageFont.load_default(size)
+
+def wrap_text(text, font, max_width, max_lines=QUOTE_STYLE["max_lines"]):
+    """
+    Greedy word wrap on measured pixel widths. Explicit newlines are kept.
+    Lines past max_lines are dropped and the last kept line gets an ellipsis.
+    """
+    lines = []
+    for paragraph in text.split('\n'):
+        current = ""
+        for word in paragraph.split():
+            candidate = f"{current} {word}" if current else word
+            if current and font.getlength(candidate) > max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            lines.append(current)
+
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] += "..."
+    return lines
+
+def _cache_path(text, width, height, font_file, style, cache_dir):
+    raw = f"{CACHE_VERSION}|{text}|{width}x{height}|{os.path.abspath(font_file) if font_file else ''}|{sorted(style.items())}"
+    return os.path.join(cache_dir, f"{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]}.png")
+
+def _prune_cache(cache_dir, keep=MAX_CACHED_CARDS):
+    cards = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.png')]
+    cards.sort(key=os.path.getmtime, reverse=True)
+    for stale in cards[keep:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+def render_quote_card(text, width, height, font_file=None, style=None, cache_dir=QUOTE_CARD_CACHE_DIR):
+    """
+    Renders the quote once to a transparent PNG sized to the text block (not the frame),
+    cached by text + frame size + font + style. Overlay it centered on the video.
+    Returns the PNG path, or None if there is no text or rendering failed.
+    """
+    if not text or not text.strip():
+        return None
+    style = dict(QUOTE_STYLE, **(style or {}))
+    try:
+        from PIL import Image, ImageDraw
+
+        os.makedirs(cache_dir, exist_ok=True)
+        card_path = _cache_path(text, width, height, font_file, style, cache_dir)
+        if os.path.exists(card_path):
+            os.utime(card_path)
+            return card_path
+
+        scale = height / 1920
+        font = _load_font(font_file, max(1, round(style["font_size"] * scale)))
+        line_spacing = round(style["line_spacing"] * scale)
+        shadow = max(1, round(style["shadow_offset"] * scale))
+
+        lines = wrap_text(text, font, width * style["max_width_ratio"], style["max_lines"])
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
+        line_widths = [font.getlength(line) for line in lines]
+        card_w = int(max(line_widths)) + shadow + 2
+        card_h = len(lines) * line_height + (len(lines) - 1) * line_spacing + shadow + 2
+        # Even dimensions keep the centered overlay on the chroma grid
+        card_w += card_w % 2
+        card_h += card_h % 2
+
+        card = Image.new("RGBA", (card_w, card_h), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(card)
+        text_w = card_w - shadow
+        for i, (line, line_w) in enumerate(zip(lines, line_widths)):
+            x = (text_w - line_w) / 2
+            y = i * (line_height + line_spacing)
+            draw.text((x + shadow, y + shadow), line, font=font, fill=style["shadow"])
+            draw.text((x, y), line, font=font, fill=style["fill"])
+
+        tmp_path = f"{card_path}.tmp.png"
+        card.save(tmp_path)
+        os.replace(tmp_path, card_path)
+        _prune_cache(cache_dir)
+        logger.info(f"Rendered quote card ({len(lines)} lines, {card_w}x{card_h}): {card_path}")
+        return card_path
+    except Exception as e:
+        logger.error(f"Failed to render quote card: {e}")
+        return None
@@ -0,0 +1,68 @@
+import ffmpeg
+
+# YouTube custom thumbnails: JPEG under 2 MB, 1280px on the long side is plenty
+THUMBNAIL_MAX_SIDE = 1280
+THUMBNAIL_QUALITY = 2 # mjpeg q:v, 2 = best
+
+# Low-res preview for quick review of a render
+PREVIEW_SHORT_SIDE = 360
+PREVIEW_FPS = 15
+PREVIEW_VIDEO_ARGS = {
+    "vcodec": "libx264",
+    "pix_fmt": "yuv420p",
+    "preset": "veryfast",
+    "crf": 32,
+    "r": PREVIEW_FPS,
+}
+
+def split_side_outputs(video, fps, thumbnail_path=None, thumbnail_time=None, preview_path=None, preview_audio=None, duration=None):
+    """
+    Splits the fully composed video stream (background + subtitles/quote) so the
+    thumbnail and preview come out of the same decode and filter pass as the final video.
+    thumbnail_time: seconds into this stream to grab; None skips the thumbnail.
+    Returns (video stream for the main output, list of extra ffmpeg outputs).
+    """
+    want_thumbnail = bool(thumbnail_path) and thumbnail_time is not None
+    branches = 1 + want_thumbnail + bool(preview_path)
+    if branches == 1:
+        return video, []
+
+    split = video.filter_multi_output('split', branches)
+    extra_outputs = []
+    branch = 1
+
+    if want_thumbnail:
+        frame_number = max(0, int(round(thumbnail_time * fps)))
+        thumbnail = (
+            split[branch]
+            .filter('select', f'eq(n,{frame_number})')
+            .filter(
+                'scale',
+                f"if(gt(iw,ih),min({THUMBNAIL_MAX_SIDE},iw),-2)",
+                f"if(gt(iw,ih),-2,min({THUMBNAIL_MAX_SIDE},ih))"
+            )
+        )
+        extra_outputs.append(ffmpeg.output(thumbnail, thumbnail_path, vframes=1, **{'q:v': THUMBNAIL_QUALITY}))
+        branch += 1
+
+    if preview_path:
+        preview = (
+            split[branch]
+            .filter('fps', fps=PREVIEW_FPS)
+            .filter(
+                'scale',
+                f"if(gt(iw,ih),-2,{PREVIEW_SHORT_SIDE})",
+                f"if(gt(iw,ih),{PREVIEW_SHORT_SIDE},-2)"
+            )
+        )
+        streams = [preview, preview_audio] if preview_audio is not None else [preview]
+        output_kwargs = dict(PREVIEW_VIDEO_ARGS)
+        if preview_audio is not None:
+            output_kwargs['acodec'] = 'copy'
+        else:
+            output_kwargs['an'] = None
+        if duration:
+            output_kwargs['t'] = duration
+        extra_outputs.append(ffmpeg.output(*streams, preview_path, **output_kwargs))
+
+    return split[0], extra_outputs
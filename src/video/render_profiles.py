@@ -0,0 +1,110 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "standard"
+
+# Used when settings.yaml has no render section. "standard" matches the
+# historical output (libx264 defaults, full resolution, 30 fps).
+DEFAULT_PROFILES = {
+    "draft": {
+        "short_side": 540,
+        "fps": 15,
+        "preset": "ultrafast",
+        "crf": 30,
+        "tune": "fastdecode",
+        "image_tune": "stillimage",
+        "threads": 0,
+    },
+    "standard": {
+        "short_side": None,
+        "fps": 30,
+        "preset": "medium",
+        "crf": 23,
+        "tune": None,
+        "image_tune": "stillimage",
+        "threads": 0,
+    },
+    "archival": {
+        "short_side": None,
+        "fps": 30,
+        "preset": "slow",
+        "crf": 18,
+        "tune": "film",
+        "image_tune": "stillimage",
+        "threads": 0,
+    },
+}
+
+def _even(value):
+    return max(2, int(round(value / 2.0)) * 2)
+
+def profile_names(config=None):
+    """Names of the profiles get_render_profile accepts (render.profiles, else the defaults)."""
+    return list(((config or {}).get('render', {}).get('profiles') or DEFAULT_PROFILES).keys())
+
+def get_render_profile(name=None, config=None, orientation="portrait"):
+    """
+    Resolves a named render profile into concrete encode settings.
+    Resolution comes from video.resolution (portrait) unless the profile sets
+    short_side; landscape swaps the axes.
+    Returns dict: name, width, height, fps, preset, crf, tune, image_tune, threads.
+    """
+    config = config or {}
+    render_config = config.get('render', {})
+    profiles = render_config.get('profiles') or DEFAULT_PROFILES
+    name = name or render_config.get('default_profile', DEFAULT_PROFILE)
+
+    if name not in profiles:
+        logger.warning(f"Unknown render profile '{name}'. Using '{DEFAULT_PROFILE}'.")
+        name = DEFAULT_PROFILE
+    profile = dict(DEFAULT_PROFILES.get(name, DEFAULT_PROFILES[DEFAULT_PROFILE]))
+    profile.update(profiles.get(name, {}))
+
+    video_config = config.get('video', {})
+    base_w, base_h = video_config.get('resolution', [1080, 1920])
+    short_base, long_base = min(base_w, base_h), max(base_w, base_h)
+
+    short_side = profile.get('short_side') or short_base
+    long_side = _even(long_base * short_side / short_base)
+    short_side = _even(short_side)
+
+    if orientation == "landscape":
+        width, height = long_side, short_side
+    else:
+        width, height = short_side, long_side
+
+    resolved = {
+        "name": name,
+        "width": width,
+        "height": height,
+        "fps": profile.get('fps') or video_config.get('fps', 30),
+        "preset": profile.get('preset'),
+        "crf": profile.get('crf'),
+        "tune": profile.get('tune'),
+        "image_tune": profile.get('image_tune'),
+        "threads": profile.get('threads'),
+    }
+    logger.info(
+        f"Render profile '{name}': {width}x{height}@{resolved['fps']}fps, "
+        f"preset={resolved['preset']}, crf={resolved['crf']}"
+    )
+    return resolved
+
+def x264_output_args(profile, still_image=False):
+    """ffmpeg.output() kwargs for the video encode of a resolved profile."""
+    args = {
+        "vcodec": "libx264",
+        "pix_fmt": "yuv420p",
+        "r": profile['fps'],
+    }
+    if profile.get('preset'):
+        args['preset'] = profile['preset']
+    if profile.get('crf') is not None:
+        args['crf'] = profile['crf']
+    tune = profile.get('image_tune') if still_image else profile.get('tune')
+    if tune:
+        args['tune'] = tune
+    if profile.get('threads'):
+        args['threads'] = profile['threads']
+    return args
@@ -0,0 +1,35 @@
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import audio_analysis
+
+def test_speech_window_and_loudness():
+    print("Testing silence trimming on synthetic PCM...")
+    sr = audio_analysis.ANALYSIS_SAMPLE_RATE
+    silence = np.zeros(sr, dtype=np.int16)  # 1s
+    t = np.arange(2 * sr) / sr
+    tone = (0.5 * 32767 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)  # 2s
+    samples = np.concatenate([silence, tone, silence, silence[:sr // 2]])
+
+    result = audio_analysis.measure_samples(samples, sample_rate=sr)
+    print(result)
+
+    assert abs(result['duration'] - 4.5) < 1e-6
+    assert abs(result['speech_start'] - 1.0) < 0.03
+    assert abs(result['speech_end'] - 3.0) < 0.03
+    # Half-scale sine over 2/4.5 of the file: ~ -9 dBFS - 3.5 dB
+    assert -14.0 < result['rms_db'] < -11.0
+    print("✅ Speech window and loudness measured correctly.")
+
+def test_all_silent():
+    result = audio_analysis.measure_samples(np.zeros(16000, dtype=np.int16))
+    assert result['speech_start'] == 0.0
+    assert result['speech_end'] == result['duration'] == 1.0
+
+if __name__ == "__main__":
+    test_speech_window_and_loudness()
+    test_all_silent()
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import tempfile
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.generators import background_pool, image_gen
+
+def _fake_generate(calls):
+    def generate(prompt, output_dir="assets/temp", config=None, orientation=None, allow_placeholder=True, **kwargs):
+        calls.append((prompt, orientation, allow_placeholder))
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"bg_fake_{len(calls)}.png")
+        with open(path, 'wb') as f:
+            f.write(b'png')
+        return path
+    return generate
+
+def test_fill_and_pop():
+    print("Testing background prefetch pool...")
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp, patch.object(image_gen, "generate_background", _fake_generate(calls)):
+        background_pool.configure({"image_generation": {"prefetch_pool": {"dir": os.path.join(tmp, "pool"), "size": 2}}})
+        assert background_pool.fill("landscape", "cinematic") == 2
+        assert background_pool.fill("landscape", "cinematic") == 0
+        # Prompts come from the family, placeholders are never pooled
+        assert all(p in image_gen.PROMPT_FAMILIES["cinematic"] and o == "landscape" and not a for p, o, a in calls)
+
+        with patch.object(background_pool, "start_worker") as start_worker:
+            path = background_pool.pop("landscape", "cinematic", output_dir=os.path.join(tmp, "temp"))
+            assert path and os.path.exists(path) and path.startswith(os.path.join(tmp, "temp"))
+            start_worker.assert_called_once_with([("landscape", "cinematic")])
+            # An empty pool doesn't start a refill that would race the live fallback
+            assert background_pool.pop("portrait", "abstract", output_dir=os.path.join(tmp, "temp")) is None
+            assert start_worker.call_count == 1
+    background_pool.configure()
+    print("✅ Pool filled from the prompt family and popped without generating.")
+
+def test_fill_clears_partial_incoming_files():
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp, patch.object(image_gen, "generate_background", _fake_generate(calls)):
+        background_pool.configure({"image_generation": {"prefetch_pool": {"dir": tmp, "size": 1}}})
+        incoming = os.path.join(tmp, "portrait_abstract", ".incoming")
+        os.makedirs(incoming)
+        with open(os.path.join(incoming, "bg_partial.png"), 'wb') as f:
+            f.write(b'pn')
+        assert background_pool.fill("portrait", "abstract") == 1
+        assert os.listdir(incoming) == []
+    background_pool.configure()
+    print("✅ Leftover partial downloads cleared.")
+
+def test_failed_generation_stops_refill():
+    with tempfile.TemporaryDirectory() as tmp, patch.object(image_gen, "generate_background", lambda *a, **k: None):
+        background_pool.configure({"image_generation": {"prefetch_pool": {"dir": tmp, "size": 3}}})
+        assert background_pool.fill("portrait", "abstract") == 0
+    background_pool.configure()
+
+def test_wait_joins_running_refill():
+    calls = []
+    fake = _fake_generate(calls)
+    def slow_generate(*args, **kwargs):
+        time.sleep(0.3)
+        return fake(*args, **kwargs)
+    with tempfile.TemporaryDirectory() as tmp, patch.object(image_gen, "generate_background", slow_generate), \
+            patch.dict(os.environ):
+        os.environ.pop("GITHUB_ACTIONS", None)
+        background_pool.configure({"image_generation": {"prefetch_pool": {"dir": tmp, "size": 2, "join_seconds": 0.1}}})
+        worker = background_pool.start_worker([("portrait", "abstract")])
+        # Bounded by join_seconds: the refill is still going
+        assert not background_pool.wait() and worker.is_alive()
+        assert background_pool.wait(timeout=5) and not worker.is_alive()
+        assert len(os.listdir(os.path.join(tmp, "portrait_abstract"))) == 3  # 2 images + .incoming
+    background_pool.configure()
+    assert background_pool.wait()
+    print("✅ A finished run waits for the refill, up to join_seconds.")
+
+if __name__ == "__main__":
+    test_fill_and_pop()
+    test_fill_clears_partial_incoming_files()
+    test_failed_generation_stops_refill()
+    test_wait_joins_running_refill()
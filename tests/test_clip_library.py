@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import clip_library
+
+def _write_clip(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+
+def test_search_cache_ttl():
+    with tempfile.TemporaryDirectory() as tmp:
+        clip_library.configure({"dir": tmp, "search_ttl_hours": 1})
+        assert clip_library.get_search("Focus nature", "portrait", 5) is None
+        clip_library.put_search("Focus nature", "portrait", 5, 1, {"videos": [{"id": 1}]})
+        # Case/whitespace of the query doesn't matter; a different orientation does
+        assert clip_library.get_search(" focus nature", "portrait", 5) == {"videos": [{"id": 1}]}
+        assert clip_library.get_search("focus nature", "landscape", 5) is None
+
+        # Survives a restart, expires after the TTL (still usable as a stale fallback)
+        clip_library.configure({"dir": tmp, "search_ttl_hours": 1})
+        clip_library._load_index()['searches']["focus nature|portrait|5|1"]['fetched_at'] -= 7200
+        assert clip_library.get_search("focus nature", "portrait", 5) is None
+        assert clip_library.get_search("focus nature", "portrait", 5, allow_stale=True) is not None
+    clip_library.configure()
+
+def test_lru_eviction_keeps_budget():
+    print("Testing clip library LRU eviction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        clip_library.configure({"dir": tmp, "max_gb": 2500 / 1024 ** 3})
+        paths = [clip_library.clip_path(i, {"id": 100 + i}) for i in range(3)]
+        for path in paths:
+            _write_clip(path, 1000)
+            clip_library.add_clip(path)
+            time.sleep(0.01)
+        # Nothing is evicted while the run may still read its clips
+        assert all(os.path.exists(path) for path in paths)
+        clip_library.evict()
+        print(sorted(os.listdir(tmp)))
+        # Three 1000-byte clips in a 2500-byte budget: the oldest one goes
+        assert not os.path.exists(paths[0])
+        assert os.path.exists(paths[1]) and os.path.exists(paths[2])
+
+        # Using a clip makes it recent again
+        assert clip_library.lookup_clip(paths[1])
+        time.sleep(0.01)
+        extra = clip_library.clip_path(9, {"width": 1920, "height": 1080})
+        _write_clip(extra, 1000)
+        clip_library.add_clip(extra)
+        clip_library.evict()
+        assert os.path.exists(paths[1]) and not os.path.exists(paths[2])
+        assert clip_library.owns(extra) and not clip_library.owns(os.path.join(tmp, "..", "other.mp4"))
+    clip_library.configure()
+    print("✅ Least recently used clips evicted first.")
+
+if __name__ == "__main__":
+    test_search_cache_ttl()
+    test_lru_eviction_keeps_budget()
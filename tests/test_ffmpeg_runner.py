@@ -0,0 +1,53 @@
+import io
+import os
+import sys
+import threading
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import ffmpeg_runner
+
+PROGRESS_OUTPUT = b"""frame=120
+fps=48.00
+out_time_us=4000000
+out_time=00:00:04.000000
+speed=1.6x
+progress=continue
+frame=240
+fps=47.50
+out_time_us=8000000
+out_time=00:00:08.000000
+speed=N/A
+progress=end
+"""
+
+def test_progress_blocks_are_parsed():
+    print("Testing ffmpeg -progress parsing...")
+    state = {"out_time": 0.0, "frame": 0, "fps": 0.0, "speed": None, "done": False, "last_advance": 0.0}
+    ffmpeg_runner._read_progress(io.BytesIO(PROGRESS_OUTPUT), state, threading.Lock())
+    print(state)
+    assert state["frame"] == 240
+    assert state["out_time"] == 8.0
+    assert state["fps"] == 47.5
+    assert state["speed"] is None
+    assert state["done"]
+    assert state["last_advance"] > 0
+    print("✅ Progress parsed.")
+
+def test_eta_from_output_rate():
+    state = {"out_time": 10.0}
+    # 10 s of media in 5 s -> 2x, 30 s left -> 15 s
+    assert abs(ffmpeg_runner._eta(state, 40.0, 5.0) - 15.0) < 1e-9
+    assert ffmpeg_runner._eta({"out_time": 0.0}, 40.0, 5.0) is None
+
+def test_configure_keeps_defaults():
+    settings = ffmpeg_runner.configure({"stall_seconds": 30})
+    assert settings["stall_seconds"] == 30
+    assert settings["deadline_seconds"] == ffmpeg_runner.DEFAULT_SETTINGS["deadline_seconds"]
+    ffmpeg_runner.configure(None)
+
+if __name__ == "__main__":
+    test_progress_blocks_are_parsed()
+    test_eta_from_output_rate()
+    test_configure_keeps_defaults()
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import font_setup
+
+def test_fonts_conf_falls_back_to_system_fonts():
+    print("Testing fontconfig config...")
+    with tempfile.TemporaryDirectory() as tmp:
+        conf_path = font_setup.write_fonts_conf(os.path.join(tmp, "fonts"), os.path.join(tmp, "cache"), "Liberation Sans")
+        with open(conf_path, encoding='utf-8') as f:
+            conf = f.read()
+    assert '<include ignore_missing="yes">/etc/fonts/fonts.conf</include>' in conf
+    # Bundled aliases must come first to beat the system's own Arial aliases
+    assert conf.index('<family>Arial</family>') < conf.index('<include')
+    print("✅ Bundled font first, system fonts as glyph fallback.")
+
+def test_font_is_picked_by_name():
+    fonts = ["/f/AAA-Regular.ttf", "/f/DejaVuSans-Bold.ttf", "/f/LiberationSans-Bold.ttf"]
+    assert font_setup.pick_font_file(fonts) == "/f/LiberationSans-Bold.ttf"
+    assert font_setup.pick_font_file(fonts[:2]) == "/f/DejaVuSans-Bold.ttf"
+    assert font_setup.pick_font_file(["/f/Other.otf"]) == "/f/Other.otf"
+    assert font_setup.pick_font_file([]) is None
+    print("✅ Preferred face chosen by file name.")
+
+if __name__ == "__main__":
+    test_fonts_conf_falls_back_to_system_fonts()
+    test_font_is_picked_by_name()
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import media_probe
+
+FFPROBE_OUTPUT = {
+    "format": {"duration": "12.512000", "format_name": "mov,mp4,m4a,3gp,3g2,mj2", "bit_rate": "4123456"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920,
+         "avg_frame_rate": "30000/1001", "r_frame_rate": "30000/1001", "pix_fmt": "yuv420p",
+         "nb_frames": "375", "duration": "12.512000"},
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2, "duration": "12.480000"},
+    ],
+}
+
+def test_summarize_probe():
+    print("Testing ffprobe summary...")
+    info = media_probe.summarize_probe(FFPROBE_OUTPUT)
+    print(info)
+    assert info["duration"] == 12.512
+    assert info["video"]["width"] == 1080 and info["video"]["height"] == 1920
+    assert abs(info["video"]["fps"] - 29.97) < 0.01
+    assert info["video"]["nb_frames"] == 375
+    assert info["audio"]["sample_rate"] == 48000
+    print("✅ Probe summarized.")
+
+def test_summarize_audio_only_uses_stream_duration():
+    info = media_probe.summarize_probe({"format": {}, "streams": [{"codec_type": "audio", "codec_name": "mp3", "duration": "3.5"}]})
+    assert info["video"] is None
+    assert info["duration"] == 3.5
+
+def test_cache_hit_skips_ffprobe():
+    print("Testing persistent probe cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        media_path = os.path.join(tmp, "clip.mp4")
+        with open(media_path, "wb") as f:
+            f.write(b"not really a video")
+        st = os.stat(media_path)
+        cache_path = os.path.join(tmp, "probe.json")
+        # Never touch the real assets/cache file from tests
+        media_probe.configure(cache_path)
+        cached_info = media_probe.summarize_probe(FFPROBE_OUTPUT)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"version": media_probe.CACHE_VERSION, "entries": {
+                os.path.abspath(media_path): {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "probed_at": 0, "info": cached_info}
+            }}, f)
+
+        # Served from the cache file even though the bytes aren't a real video
+        assert media_probe.probe(media_path)["duration"] == 12.512
+
+        # Rewriting the file invalidates the entry (ffprobe then rejects it)
+        with open(media_path, "wb") as f:
+            f.write(b"changed contents!!")
+        os.utime(media_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert media_probe.probe(media_path) is None
+    media_probe.configure()
+    print("✅ Cache keyed on size and mtime.")
+
+if __name__ == "__main__":
+    test_summarize_probe()
+    test_summarize_audio_only_uses_stream_duration()
+    test_cache_hit_skips_ffprobe()
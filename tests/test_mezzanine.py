@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import ffmpeg
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import media_probe
+from src.video import mezzanine
+
+def test_mezzanine_is_normalized_and_cached():
+    print("Testing mezzanine normalization...")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keeps the probes mezzanine makes out of the real assets/cache file
+        media_probe.configure(os.path.join(tmp, "probe.json"))
+        clip = os.path.join(tmp, "clip.mp4")
+        ffmpeg.input("testsrc=size=1280x720:rate=25:duration=3", f="lavfi").output(clip, pix_fmt="yuv420p").run(quiet=True, overwrite_output=True)
+        cache_dir = os.path.join(tmp, "mezz")
+
+        first = mezzanine.get_mezzanine(clip, 540, 960, 15, vignette_angle='0.5', cache_dir=cache_dir)
+        assert first and os.path.exists(first)
+        info = media_probe.probe(first)
+        print(info["video"])
+        assert (info["video"]["width"], info["video"]["height"]) == (540, 960)
+        assert abs(info["video"]["fps"] - 15) < 0.01
+        assert info["video"]["pix_fmt"] == "yuv420p"
+
+        mtime = os.path.getmtime(first)
+        assert mezzanine.get_mezzanine(clip, 540, 960, 15, vignette_angle='0.5', cache_dir=cache_dir) == first
+        assert os.path.getmtime(first) >= mtime
+        # Other orientation is its own variant
+        assert mezzanine.get_mezzanine(clip, 960, 540, 15, vignette_angle='0.5', cache_dir=cache_dir) != first
+
+        plan = mezzanine.normalize_plan([{"path": clip, "clip_duration": 3.0, "offset": 0.0, "duration": 3.0, "loops": 0}], 540, 960, 15, '0.5', cache_dir)
+        assert plan[0]["path"] == first and plan[0]["normalized"]
+    media_probe.configure()
+    print("✅ Clip normalized once and reused.")
+
+if __name__ == "__main__":
+    test_mezzanine_is_normalized_and_cached()
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.video import quote_card
+
+def test_wrap_respects_pixel_width():
+    print("Testing pixel-width quote wrapping...")
+    font = quote_card._load_font(None, 40)
+    text = "The only way to do great work is to love what you do"
+    lines = quote_card.wrap_text(text, font, max_width=300)
+    print(lines)
+    assert " ".join(lines) == text
+    assert all(font.getlength(line) <= 300 for line in lines)
+    print("✅ Lines fit the width.")
+
+def test_wrap_keeps_newlines_and_truncates():
+    font = quote_card._load_font(None, 40)
+    lines = quote_card.wrap_text("One\nTwo\nThree\nFour\nFive\nSix", font, max_width=1000, max_lines=5)
+    assert lines == ["One", "Two", "Three", "Four", "Five..."]
+
+def test_card_is_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = quote_card.render_quote_card("Stay hungry, stay foolish.", 540, 960, cache_dir=tmp)
+        assert first and os.path.exists(first)
+        assert quote_card.render_quote_card("Stay hungry, stay foolish.", 540, 960, cache_dir=tmp) == first
+        assert quote_card.render_quote_card("Something else", 540, 960, cache_dir=tmp) != first
+        assert quote_card.render_quote_card("   ", 540, 960, cache_dir=tmp) is None
+
+if __name__ == "__main__":
+    test_wrap_respects_pixel_width()
+    test_wrap_keeps_newlines_and_truncates()
+    test_card_is_cached()
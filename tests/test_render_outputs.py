@@ -0,0 +1,44 @@
+import os
+import sys
+import ffmpeg
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.video import render_outputs
+
+def _compile(video, side_outputs, main_path="main.mp4"):
+    out = ffmpeg.output(video, main_path)
+    if side_outputs:
+        out = ffmpeg.merge_outputs(out, *side_outputs)
+    return " ".join(ffmpeg.compile(out))
+
+def test_no_side_outputs_leaves_graph_alone():
+    video = ffmpeg.input("bg.mp4").video
+    main, extra = render_outputs.split_side_outputs(video, 30)
+    assert main is video and extra == []
+    # A thumbnail path without a time is skipped too
+    main, extra = render_outputs.split_side_outputs(video, 30, thumbnail_path="t.jpg")
+    assert extra == []
+
+def test_thumbnail_and_preview_share_one_pass():
+    print("Testing thumbnail + preview split...")
+    video = ffmpeg.input("bg.mp4").video
+    audio = ffmpeg.input("bed.m4a").audio
+    main, extra = render_outputs.split_side_outputs(
+        video, 30,
+        thumbnail_path="t.jpg", thumbnail_time=2.0,
+        preview_path="p.mp4", preview_audio=audio, duration=10
+    )
+    assert len(extra) == 2
+    cmd = _compile(main, extra)
+    print(cmd)
+    assert cmd.count("split=3") == 1
+    assert "select=eq(n\\,60)" in cmd
+    assert "fps=fps=15" in cmd
+    assert "t.jpg" in cmd and "p.mp4" in cmd and "main.mp4" in cmd
+    print("✅ One filter graph feeds all three outputs.")
+
+if __name__ == "__main__":
+    test_no_side_outputs_leaves_graph_alone()
+    test_thumbnail_and_preview_share_one_pass()
@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import httplib2
+from unittest.mock import patch
+from googleapiclient.http import HttpRequest
+from googleapiclient.model import JsonModel
+from googleapiclient.errors import HttpError
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.upload import resumable_upload
+
+CHUNK = resumable_upload.CHUNK_GRANULARITY
+SESSION_URI = "https://upload.example/session/1"
+
+class FakeHttp:
+    """Scripted transport: each request pops the next (status, headers, body) or raises it."""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.requests.append((method, uri, (headers or {}).get("Content-Range")))
+        response = self.responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        status, extra, content = response
+        return httplib2.Response(dict(extra, status=str(status))), content
+
+def _request(http, file_path):
+    return HttpRequest(
+        http, JsonModel(False).response, "https://upload.example/upload",
+        method="POST", body="{}", headers={"content-type": "application/json"},
+        resumable=resumable_upload.media(file_path, mimetype="video/mp4")
+    )
+
+def test_session_survives_restart():
+    print("Testing persistent resumable upload sessions...")
+    with tempfile.TemporaryDirectory() as tmp, patch.object(resumable_upload.time, "sleep", lambda s: None):
+        resumable_upload.configure({"chunk_mb": 0.25, "retries": 2, "session_dir": os.path.join(tmp, "sessions")})
+        assert resumable_upload.chunk_size() == CHUNK
+        file_path = os.path.join(tmp, "video.mp4")
+        with open(file_path, "wb") as f:
+            f.write(os.urandom(CHUNK * 3 - 100))
+
+        # First run: chunk 1 lands, then the server keeps failing until the retries are spent
+        first = FakeHttp([
+            (200, {"location": SESSION_URI}, b""),
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""),
+            (503, {}, b"busy"),
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""), (503, {}, b"busy"),
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""), (503, {}, b"busy"),
+        ])
+        try:
+            resumable_upload.execute(_request(first, file_path), file_path, "youtube", metadata={"title": "T"})
+            assert False, "expected the upload to give up"
+        except HttpError as e:
+            assert e.resp.status == 503
+        sessions = resumable_upload.pending()
+        assert len(sessions) == 1 and resumable_upload.has_session(file_path)
+        assert sessions[0]["resumable_uri"] == SESSION_URI and sessions[0]["offset"] == CHUNK
+        assert sessions[0]["metadata"] == {"title": "T"}
+
+        # Second run: a fresh request asks the saved session for its offset and carries on
+        second = FakeHttp([
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""),
+            ConnectionResetError("reset by peer"),
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""),
+            (308, {"range": f"bytes=0-{2 * CHUNK - 1}"}, b""),
+            (200, {}, b'{"id": "abc"}'),
+        ])
+        response = resumable_upload.execute(_request(second, file_path), file_path, "youtube")
+        assert response == {"id": "abc"}
+        # No new session was started and chunk 1 was never sent again
+        assert all(method == "PUT" and uri == SESSION_URI for method, uri, _ in second.requests)
+        assert not any(r and r.startswith("bytes 0-") for _, _, r in second.requests)
+        assert resumable_upload.pending() == [] and not resumable_upload.has_session(file_path)
+    print("✅ Upload resumed from the committed offset after a restart.")
+
+def test_expired_session_starts_over():
+    with tempfile.TemporaryDirectory() as tmp:
+        resumable_upload.configure({"chunk_mb": 0.25, "session_dir": os.path.join(tmp, "sessions")})
+        file_path = os.path.join(tmp, "video.mp4")
+        with open(file_path, "wb") as f:
+            f.write(b"x" * 1000)
+        first = FakeHttp([(200, {"location": SESSION_URI}, b""), KeyboardInterrupt()])
+        try:
+            resumable_upload.execute(_request(first, file_path), file_path, "drive")
+        except KeyboardInterrupt:
+            pass
+        assert resumable_upload.pending()[0]["offset"] == 0
+
+        second = FakeHttp([
+            (404, {}, b"gone"),
+            (200, {"location": "https://upload.example/session/2"}, b""),
+            (200, {}, b'{"id": "new"}'),
+        ])
+        assert resumable_upload.execute(_request(second, file_path), file_path, "drive") == {"id": "new"}
+        assert second.requests[1][0] == "POST"
+        # Sessions for files that changed or vanished are dropped
+        first = FakeHttp([(200, {"location": SESSION_URI}, b""), KeyboardInterrupt()])
+        try:
+            resumable_upload.execute(_request(first, file_path), file_path, "drive")
+        except KeyboardInterrupt:
+            pass
+        os.remove(file_path)
+        assert resumable_upload.pending() == []
+    print("✅ Expired and orphaned sessions are discarded.")
+
+def test_client_error_drops_session():
+    print("Testing that 4xx errors drop the saved session...")
+    with tempfile.TemporaryDirectory() as tmp, patch.object(resumable_upload.time, "sleep", lambda s: None):
+        resumable_upload.configure({"chunk_mb": 0.25, "retries": 2, "session_dir": os.path.join(tmp, "sessions")})
+        file_path = os.path.join(tmp, "video.mp4")
+        with open(file_path, "wb") as f:
+            f.write(os.urandom(CHUNK * 2))
+        # The session exists and a chunk is committed before the server refuses the upload
+        http = FakeHttp([
+            (200, {"location": SESSION_URI}, b""),
+            (308, {"range": f"bytes=0-{CHUNK - 1}"}, b""),
+            (403, {}, b"quotaExceeded"),
+        ])
+        try:
+            resumable_upload.execute(_request(http, file_path), file_path, "youtube")
+            assert False, "expected the 403 to be raised"
+        except HttpError as e:
+            assert e.resp.status == 403
+        # Not retried, and nothing left to resume
+        assert len(http.requests) == 3
+        assert resumable_upload.pending() == [] and not resumable_upload.has_session(file_path)
+    print("✅ Non-retriable errors leave no session behind.")
+
+if __name__ == "__main__":
+    test_session_survives_restart()
+    test_expired_session_starts_over()
+    test_client_error_drops_session()
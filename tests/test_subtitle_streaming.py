@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import subtitle_utils
+
+def word_stream(count, consumed):
+    """Synthetic narration: 400 ms words with 100 ms gaps (offsets in ns)."""
+    for i in range(count):
+        consumed.append(i)
+        yield {'text': f"word{i % 7}", 'offset': i * 500_000_000, 'duration': 400_000_000}
+
+def test_ms_timestamps():
+    assert subtitle_utils.format_ass_timestamp_ms(0) == "0:00:00.00"
+    assert subtitle_utils.format_ass_timestamp_ms(3_723_456) == "1:02:03.45"
+    assert subtitle_utils.format_ass_timestamp_ms(-5) == "0:00:00.00"
+
+def test_long_form_events_stream_lazily():
+    print("Testing streaming long-form ASS events...")
+    consumed = []
+    events = subtitle_utils.iter_karaoke_events(word_stream(20000, consumed), video_duration=10000)
+
+    first = next(events)
+    # Only the first segment (plus one look-ahead word) was pulled from the stream
+    assert len(consumed) < 20
+    assert first.startswith("Dialogue: 0,0:00:00.00,")
+
+    remaining = sum(1 for _ in events)
+    assert len(consumed) == 20000
+    print(f"✅ {remaining + 1} events streamed from 20000 words.")
+
+def test_generate_from_generator():
+    consumed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "long.ass")
+        assert subtitle_utils.generate_karaoke_ass(word_stream(300, consumed), out, "", video_duration=200, width=1920, height=1080) == out
+        with open(out, encoding='utf-8') as f:
+            content = f.read()
+    assert "PlayResX: 1920" in content
+    assert content.count("Dialogue:") > 10
+    assert subtitle_utils.generate_karaoke_ass(iter([]), os.path.join(tempfile.gettempdir(), "none.ass"), "") is None
+
+def test_sidecar_caption_tracks():
+    print("Testing SRT/VTT caption export...")
+    words = [
+        {'text': 'Success', 'offset': 0, 'duration': 500000000},
+        {'text': 'is', 'offset': 600000000, 'duration': 200000000},
+        {'text': 'journey', 'offset': 900000000, 'duration': 600000000}
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = subtitle_utils.write_caption_tracks(iter(words), os.path.join(tmp, "voice"))
+        with open(paths['srt'], encoding='utf-8') as f:
+            srt = f.read()
+        with open(paths['vtt'], encoding='utf-8') as f:
+            vtt = f.read()
+
+    assert srt == "1\n00:00:00,000 --> 00:00:01,800\nSuccess is journey\n\n"
+    assert vtt == "WEBVTT\n\n00:00:00.000 --> 00:00:01.800\nSuccess is journey\n\n"
+
+    # Cues never overlap the next one
+    cues = list(subtitle_utils.iter_caption_cues(word_stream(200, [])))
+    assert all(a[1] <= b[0] for a, b in zip(cues, cues[1:]))
+    print("✅ Caption tracks written.")
+
+if __name__ == "__main__":
+    test_ms_timestamps()
+    test_long_form_events_stream_lazily()
+    test_generate_from_generator()
+    test_sidecar_caption_tracks()
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.upload import upload_stage, youtube_api, drive_api, resumable_upload
+from src.utils import google_auth
+
+UPLOAD_SECONDS = 0.5
+
+def _patches(calls, fail=None):
+    def load_creds():
+        calls.append(("creds", None))
+        return "creds"
+
+    def get_service(creds=None):
+        calls.append(("service", creds))
+        return f"youtube-{threading.get_ident()}"
+
+    def upload_video(file_path, title, description, tags, privacy_status="private", youtube=None, session_metadata=None):
+        calls.append(("youtube", youtube))
+        calls.append(("session_metadata", session_metadata))
+        time.sleep(UPLOAD_SECONDS)
+        if fail == "youtube":
+            raise RuntimeError("connection reset")
+        return "vid123"
+
+    def upload_file(file_path, folder_name="ShortsAutomation_Uploads", creds=None):
+        calls.append(("drive", creds))
+        time.sleep(UPLOAD_SECONDS)
+        if fail == "drive":
+            return None
+        return "https://drive.example/file"
+
+    return [
+        patch.object(google_auth, "get_authenticated_creds", load_creds),
+        patch.object(youtube_api, "get_authenticated_service", get_service),
+        patch.object(youtube_api, "upload_video", upload_video),
+        patch.object(youtube_api, "set_thumbnail", lambda *a, **k: calls.append(("thumbnail", k.get("youtube")))),
+        patch.object(drive_api, "upload_file", upload_file),
+    ]
+
+def _run(fail=None):
+    calls = []
+    patches = _patches(calls, fail)
+    for p in patches:
+        p.start()
+    try:
+        start = time.perf_counter()
+        results = upload_stage.upload("video.mp4", "title", "desc", ["tag"], thumbnail_path=__file__)
+        return results, calls, time.perf_counter() - start
+    finally:
+        for p in patches:
+            p.stop()
+
+def test_uploads_run_concurrently_with_shared_creds():
+    print("Testing concurrent upload stage...")
+    results, calls, elapsed = _run()
+    print(f"Two {UPLOAD_SECONDS}s uploads took {elapsed:.2f}s")
+    assert results == {"youtube": "vid123", "drive": "https://drive.example/file"}
+    assert elapsed < UPLOAD_SECONDS * 1.8
+    # Credentials loaded once and handed to both uploads
+    assert [c for c in calls if c[0] == "creds"] == [("creds", None)]
+    assert ("service", "creds") in calls and ("drive", "creds") in calls
+    # The thumbnail goes through the same service as the upload
+    service = dict(calls)["youtube"]
+    assert ("thumbnail", service) in calls
+    # The thumbnail path is saved with the session so a resumed upload still sets it
+    assert dict(calls)["session_metadata"]["thumbnail_path"] == __file__
+    print("✅ Uploads overlap and share one credential load.")
+
+def test_failures_are_independent():
+    results, _, _ = _run(fail="youtube")
+    assert results == {"youtube": None, "drive": "https://drive.example/file"}
+    results, calls, _ = _run(fail="drive")
+    assert results == {"youtube": "vid123", "drive": None}
+    assert any(c[0] == "thumbnail" for c in calls)
+    print("✅ One failed upload doesn't affect the other.")
+
+def test_resume_pending_uploads_saved_targets_only():
+    sessions = [
+        {"file": "/out/short_1.mp4", "target": "youtube", "metadata": {
+            "title": "T", "description": "D", "tags": ["a"], "privacy_status": "public",
+            "thumbnail_path": "/out/short_1_thumb.jpg", "caption_path": "/tmp/voice.srt", "caption_language": "en"
+        }},
+        {"file": "/out/long_2.mp4", "target": "drive", "metadata": {"folder_name": "Backups"}},
+    ]
+    calls = []
+    def upload(file_path, title, description, tags, **kwargs):
+        calls.append((file_path, title, kwargs))
+        return {name: "ok" for name in ("youtube", "drive") if kwargs[name]}
+    with patch.object(resumable_upload, "pending", lambda: sessions), patch.object(upload_stage, "upload", upload):
+        finished = upload_stage.resume_pending()
+    assert finished["/out/short_1.mp4"] == {
+        "results": {"youtube": "ok"}, "thumbnail_path": "/out/short_1_thumb.jpg", "caption_path": "/tmp/voice.srt"
+    }
+    assert finished["/out/long_2.mp4"]["results"] == {"drive": "ok"}
+    short = calls[0]
+    assert short[1] == "T" and short[2]["privacy_status"] == "public" and not short[2]["drive"]
+    assert short[2]["thumbnail_path"] == "/out/short_1_thumb.jpg" and short[2]["caption_path"] == "/tmp/voice.srt"
+    assert calls[1][2]["drive_folder"] == "Backups" and not calls[1][2]["youtube"]
+    print("✅ Interrupted uploads resume with their saved metadata.")
+
+def test_release_files_keeps_only_resumable_uploads():
+    with tempfile.TemporaryDirectory() as tmp:
+        def make_files():
+            paths = [os.path.join(tmp, name) for name in ("v.mp4", "v_thumb.jpg", "v.srt")]
+            for path in paths:
+                open(path, "wb").close()
+            return paths
+
+        # Failed before a session existed (no credentials, 4xx at start): nothing to resume
+        video, thumb, captions = make_files()
+        with patch.object(resumable_upload, "has_session", lambda path: False):
+            assert upload_stage.release_files(video, [thumb, captions, None])
+        assert not any(os.path.exists(p) for p in (video, thumb, captions))
+
+        # A saved session keeps everything for the next run
+        video, thumb, captions = make_files()
+        with patch.object(resumable_upload, "has_session", lambda path: True):
+            assert not upload_stage.release_files(video, [thumb, captions])
+        assert all(os.path.exists(p) for p in (video, thumb, captions))
+    print("✅ Files are only kept while a saved session can resume the upload.")
+
+if __name__ == "__main__":
+    test_uploads_run_concurrently_with_shared_creds()
+    test_failures_are_independent()
+    test_resume_pending_uploads_saved_targets_only()
+    test_release_files_keeps_only_resumable_uploads()
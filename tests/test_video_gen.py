@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.generators import video_gen
+from src.utils import clip_library
+
+# Typical Pexels portrait video_files list (largest first, as the API tends to return)
+PORTRAIT_FILES = [
+    {"id": 1, "quality": "uhd", "file_type": "video/mp4", "width": 2160, "height": 3840, "fps": 30, "link": "uhd"},
+    {"id": 2, "quality": "hd", "file_type": "video/mp4", "width": 1440, "height": 2560, "fps": 30, "link": "qhd"},
+    {"id": 3, "quality": "hd", "file_type": "video/mp4", "width": 1080, "height": 1920, "fps": 30, "link": "fhd"},
+    {"id": 4, "quality": "hd", "file_type": "video/mp4", "width": 720, "height": 1280, "fps": 30, "link": "hd"},
+    {"id": 5, "quality": "sd", "file_type": "video/mp4", "width": 540, "height": 960, "fps": 25, "link": "sd"},
+    {"id": 6, "quality": None, "file_type": "video/mp4", "width": None, "height": None, "fps": None, "link": "hls"},
+]
+
+def test_picks_smallest_rendition_covering_target():
+    print("Testing Pexels rendition selection...")
+    assert video_gen.select_video_file(PORTRAIT_FILES, 1080, 1920, 30)['link'] == "fhd"
+    assert video_gen.select_video_file(PORTRAIT_FILES, 720, 1280, 30)['link'] == "hd"
+    # The 540p file is 25 fps, so a 30 fps target takes the next size up
+    assert video_gen.select_video_file(PORTRAIT_FILES, 540, 960, 30)['link'] == "hd"
+    assert video_gen.select_video_file(PORTRAIT_FILES, 540, 960, 15)['link'] == "sd"
+    print("✅ Smallest sufficient rendition chosen.")
+
+def test_falls_back_to_largest_and_prefers_orientation():
+    # Nothing is big enough: take the largest
+    assert video_gen.select_video_file(PORTRAIT_FILES, 2880, 5120, 30)['link'] == "uhd"
+    mixed = [
+        {"file_type": "video/mp4", "width": 3840, "height": 2160, "fps": 30, "link": "landscape_uhd"},
+        {"file_type": "video/mp4", "width": 1080, "height": 1920, "fps": 30, "link": "portrait_fhd"},
+    ]
+    assert video_gen.select_video_file(mixed, 1080, 1920, 30)['link'] == "portrait_fhd"
+    assert video_gen.select_video_file([], 1080, 1920) is None
+
+def test_clip_coverage_uses_fewest_clips_without_looping():
+    print("Testing duration-aware clip planning...")
+    import random
+    videos = [{"id": i, "duration": d} for i, d in enumerate([12, 30, 8, 25, 2, 40])]
+    clips = video_gen.plan_clip_coverage(videos, 60.0, rng=random.Random(3))
+    print([(c["video"]["id"], round(c["in"], 2), round(c["out"], 2)) for c in clips])
+    # 40 + 30 covers 60s; nothing shorter is downloaded
+    assert sorted(c["video"]["duration"] for c in clips) == [30, 40]
+    assert abs(sum(c["out"] - c["in"] for c in clips) - 60.0) < 1e-6
+    for c in clips:
+        assert 0.0 <= c["in"] < c["out"] <= c["video"]["duration"]
+        assert c["out"] - c["in"] >= video_gen.MIN_SHOT_SECONDS
+    print("✅ Two clips, trimmed to exactly 60s.")
+
+def test_clip_coverage_short_candidates():
+    videos = [{"id": 1, "duration": 10}, {"id": 2, "duration": 3}, {"id": 3, "duration": None}]
+    clips = video_gen.plan_clip_coverage(videos, 60.0)
+    # Only the usable clip, in full; the caller fetches more pages
+    assert [c["video"]["id"] for c in clips] == [1]
+    assert clips[0]["in"] == 0.0
+    assert video_gen.plan_clip_coverage([], 60.0) == []
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    ranges_seen = []
+
+    def do_GET(self):
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header:
+            _RangeHandler.ranges_seen.append(range_header)
+            start = int(range_header.split('=')[1].rstrip('-'))
+        body = PAYLOAD[start:]
+        self.send_response(206 if range_header else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_download_resumes_partial_file():
+    print("Testing resumable download...")
+    server = HTTPServer(('127.0.0.1', 0), _RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/clip.mp4"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "clip.mp4")
+            # Left over from an interrupted run
+            with open(f"{output_path}.part", 'wb') as f:
+                f.write(PAYLOAD[:300000])
+
+            assert video_gen.download_video(url, output_path)
+            assert _RangeHandler.ranges_seen == ["bytes=300000-"]
+            assert not os.path.exists(f"{output_path}.part")
+            with open(output_path, 'rb') as f:
+                assert f.read() == PAYLOAD
+    finally:
+        server.shutdown()
+    print("✅ Only the missing bytes were fetched, then renamed into place.")
+
+def test_temp_download_name_includes_rendition():
+    paths = []
+    def download(url, output_path):
+        paths.append(output_path)
+        return False
+    video = {"id": 42, "video_files": PORTRAIT_FILES}
+    with tempfile.TemporaryDirectory() as tmp, patch.object(clip_library, "is_enabled", lambda: False), \
+            patch.object(video_gen, "download_video", download):
+        video_gen._download_rendition(video, tmp, 1080, 1920, 30)
+        video_gen._download_rendition(video, tmp, 720, 1280, 30)
+    assert paths == [os.path.join(tmp, "bg_video_42_3.mp4"), os.path.join(tmp, "bg_video_42_4.mp4")]
+    print("✅ Each rendition downloads (and resumes) under its own name.")
+
+if __name__ == "__main__":
+    test_picks_smallest_rendition_covering_target()
+    test_falls_back_to_largest_and_prefers_orientation()
+    test_clip_coverage_uses_fewest_clips_without_looping()
+    test_clip_coverage_short_candidates()
+    test_download_resumes_partial_file()
+    test_temp_download_name_includes_rendition()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.generators import voice_catalog, audio_gen
+
+def test_voice_catalog_indexes():
+    print("Testing voice catalog parsing and lookups...")
+    catalog = voice_catalog.get_catalog()
+    print(f"Catalog: {len(catalog)} voices, {len(catalog.locales())} locales")
+
+    assert "en-US-ChristopherNeural" in catalog
+    christopher = catalog.get("en-US-ChristopherNeural")
+    assert christopher["gender"] == "male"
+    assert "novel" in christopher["categories"]
+    assert "authority" in christopher["personalities"]
+
+    # Multi-part locales keep their full prefix
+    assert "zh-CN-liaoning" in catalog.by_locale
+
+    males = catalog.find(locale="en-US", gender="male")
+    assert "en-US-GuyNeural" in males
+    assert all(catalog.get(v)["gender"] == "male" for v in males)
+    assert catalog.find(locale="en-US", personality="Rational") == ["en-US-EricNeural", "en-US-SteffanNeural"]
+    print("✅ Catalog indexes look correct.")
+
+def test_voice_pool_selection():
+    # Elderly style stays locked to the winning WarmGrandpa voice
+    assert audio_gen.select_voice_pool(style="elderly") == ["en-US-ChristopherNeural"]
+
+    config = {'audio': {'voices_female': ["en-US-AriaNeural", "en-GB-LibbyNeural"]}}
+    assert audio_gen.select_voice_pool("en-US", specific_gender="female", config=config) == ["en-US-AriaNeural"]
+
+    # Other locales come straight from the catalog
+    pool = audio_gen.select_voice_pool("de-DE", specific_gender="male", config=config)
+    assert pool and all(v.startswith("de-DE-") for v in pool)
+    print(f"✅ de-DE male pool: {pool}")
+
+if __name__ == "__main__":
+    test_voice_catalog_indexes()
+    test_voice_pool_selection()